@@ -7,20 +7,39 @@ Supports both local-clone and curl-pipe installs.
 Re-running updates core files while preserving user configuration.
 """
 
+import functools
+import gzip
+import http.client
 import json
 import os
-import platform
+import re
 import shutil
 import subprocess
 import sys
+import tarfile
+import threading
+import time
+import urllib.error
+import urllib.parse
 import urllib.request
-import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # Optional: faster settings.json round-trip
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # Optional: stream pack manifests instead of loading them whole
+except ImportError:
+    ijson = None
 
 
 REPO_BASE = "https://raw.githubusercontent.com/bwright2810/peon-ping/main"
 REGISTRY_URL = "https://peonping.github.io/registry/index.json"
+CODELOAD_BASE = "https://codeload.github.com"
 
 # Default packs (curated English set installed by default — keep in sync with install.sh)
 DEFAULT_PACKS = (
@@ -41,21 +60,36 @@ FALLBACK_PACKS = (
 FALLBACK_REPO = "PeonPing/og-packs"
 FALLBACK_REF = "v1.1.0"
 
+# Number of concurrent downloads (override with --jobs=N or PEON_PING_PARALLEL)
+DEFAULT_JOBS = 16
+# Number of concurrent file copies for local-clone installs
+COPY_JOBS = min(32, (os.cpu_count() or 1) * 4)
+
+# A source repo's tarball is only fetched when at least this share of the
+# packs it provides is being installed; for fewer, per-file downloads (which
+# are revalidated and skipped individually) move far less data.
+ARCHIVE_MIN_SHARE = 0.5
+
+# File extensions counted as installed sounds
+SOUND_EXTENSIONS = (".wav", ".mp3", ".ogg")
+
 
 # ---------------------------------------------------------------------------
 # Platform detection (mirrors peon.py)
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=1)
 def detect_platform() -> str:
-    system = platform.system()
-    if system == "Darwin":
+    # sys.platform is fixed at build time; platform.system() calls uname()
+    if sys.platform == "darwin":
         return "mac"
-    elif system == "Windows":
+    elif sys.platform == "win32":
         return "windows"
-    elif system == "Linux":
+    elif sys.platform.startswith("linux"):
         try:
-            with open("/proc/version", "r") as fh:
-                if "microsoft" in fh.read().lower():
+            # The kernel banner is short; the WSL marker is in the first line
+            with open("/proc/version", "rb") as fh:
+                if b"microsoft" in fh.read(256).lower():
                     return "wsl"
         except Exception:
             pass
@@ -65,17 +99,354 @@ def detect_platform() -> str:
 
 PLATFORM = detect_platform()
 
+# PATH lookups don't change during an install; memoize them
+_which = functools.lru_cache(maxsize=None)(shutil.which)
+
+LINUX_PLAYERS = ("pw-play", "paplay", "ffplay", "mpv", "aplay")
+
+
+def detect_linux_player() -> str:
+    """Return the first available Linux audio player, or ``""``."""
+    for cmd in LINUX_PLAYERS:
+        if _which(cmd):
+            return cmd
+    return ""
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Idle keep-alive connections, keyed by (scheme, netloc).  Nearly every file
+# comes from raw.githubusercontent.com, so reusing sockets saves a TCP+TLS
+# handshake per download.
+_IDLE_CONNECTIONS: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+_CONNECTIONS_LOCK = threading.Lock()
+_MAX_REDIRECTS = 5
+# Downloads are streamed to disk in chunks of this size
+_COPY_BUFSIZE = 64 * 1024
+# Completed downloads, persisted in install_dir/.etags.json between runs so
+# re-running the installer can send conditional GETs and skip sounds it has
+# already fetched.  Each record is ``{"etag": ..., "file": [st_size,
+# st_mtime_ns]}`` (etag may be None); it is only trusted while the file on
+# disk is still the one that download wrote.
+ETAGS_FILE = ".etags.json"
+# Last registry fetched, with its ETag (see fetch_registry)
+REGISTRY_CACHE_FILE = ".registry.json"
+_ETAGS: Dict[str, Dict[str, Any]] = {}
+
+
+def _acquire_connection(scheme: str, netloc: str) -> http.client.HTTPConnection:
+    """Return an idle pooled connection for *netloc*, or open a new one."""
+    with _CONNECTIONS_LOCK:
+        idle = _IDLE_CONNECTIONS.get((scheme, netloc))
+        if idle:
+            return idle.pop()
+    if scheme == "https":
+        return http.client.HTTPSConnection(netloc, timeout=30)
+    return http.client.HTTPConnection(netloc, timeout=30)
+
+
+def _release_connection(
+    scheme: str, netloc: str, conn: http.client.HTTPConnection
+) -> None:
+    """Return *conn* to the pool so another download can reuse it."""
+    with _CONNECTIONS_LOCK:
+        _IDLE_CONNECTIONS.setdefault((scheme, netloc), []).append(conn)
+
+
+def _finish_response(
+    scheme: str,
+    netloc: str,
+    conn: http.client.HTTPConnection,
+    resp: http.client.HTTPResponse,
+) -> None:
+    """Pool *conn* if *resp* was fully read and keep-alive, else close it."""
+    # A body cut short leaves ``length`` non-zero: the server hung up
+    if resp.will_close or not resp.isclosed() or getattr(resp, "length", None):
+        conn.close()
+    else:
+        _release_connection(scheme, netloc, conn)
+
+
+def _open_pooled(
+    url: str, headers: Optional[Dict[str, str]] = None
+) -> Tuple[http.client.HTTPResponse, Callable[[], None]]:
+    """GET *url* on a pooled connection, following redirects.
+
+    Returns the ``200`` response and a callback that hands the connection
+    back to the pool once the body has been consumed.  Raises
+    ``urllib.error.HTTPError`` for any other status.
+    """
+    req_headers = {"User-Agent": "peon-ping-installer"}
+    req_headers.update(headers or {})
+    for _ in range(_MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh connection before giving up.
+        for attempt in range(2):
+            conn = _acquire_connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", target, headers=req_headers)
+                resp = conn.getresponse()
+                break
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if attempt:
+                    raise
+
+        if resp.status == 200:
+            return resp, lambda: _finish_response(parts.scheme, parts.netloc, conn, resp)
+
+        resp.read()
+        _finish_response(parts.scheme, parts.netloc, conn, resp)
+        location = resp.getheader("Location")
+        if resp.status in (301, 302, 303, 307, 308) and location:
+            url = urllib.parse.urljoin(url, location)
+            continue
+        raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+    raise urllib.error.HTTPError(url, resp.status, "Too many redirects", resp.headers, None)
+
+
+def _open_url(
+    url: str, headers: Optional[Dict[str, str]] = None
+) -> Tuple[Any, Callable[[], None]]:
+    """Open *url* for reading.  Returns ``(response, finish_callback)``."""
+    scheme = urllib.parse.urlsplit(url).scheme
+    # urlopen honours proxy settings; keep using it when a proxy is configured
+    if scheme not in ("http", "https") or scheme in urllib.request.getproxies():
+        req = urllib.request.Request(url, headers=headers or {})
+        resp = urllib.request.urlopen(req, timeout=30)
+        return resp, resp.close
+    return _open_pooled(url, headers)
+
+
+def fetch(url: str) -> bytes:
+    """Return the body of *url* (for small files that are edited in memory)."""
+    resp, finish = _open_url(url)
+    try:
+        return resp.read()
+    finally:
+        finish()
+
+
+def _stream_to_file(src: Any, dest: Path, expected: Optional[int] = None) -> None:
+    """Copy the readable *src* to *dest* through a sibling temp file.
+
+    *dest* is only replaced once the whole body is on disk, so an
+    interrupted or truncated transfer never leaves a partial file behind.
+    Raises ``OSError`` if fewer than *expected* bytes arrive; the temp file
+    is removed on any error.
+    """
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.part")
+    written = 0
+    try:
+        with open(tmp, "wb") as fh:
+            while True:
+                chunk = src.read(_COPY_BUFSIZE)
+                if not chunk:
+                    break
+                fh.write(chunk)
+                written += len(chunk)
+        if expected is not None and written < expected:
+            raise OSError(f"incomplete download: got {written} of {expected} bytes")
+        try:
+            shutil.copymode(dest, tmp)
+        except OSError:
+            pass
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _content_length(resp: Any) -> Optional[int]:
+    """Return the response's ``Content-Length``, or None if absent or invalid."""
+    value = resp.headers.get("Content-Length")
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _file_signature(path: Path) -> Optional[List[int]]:
+    """Return ``[st_size, st_mtime_ns]`` for *path*, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def is_downloaded(url: str, dest: Path) -> bool:
+    """Return True if *dest* is still exactly the file a completed download of *url* wrote."""
+    record = _ETAGS.get(url)
+    return record is not None and record.get("file") == _file_signature(dest)
+
+
 def download(url: str, dest: Path) -> None:
-    """Download *url* to *dest*."""
+    """Stream *url* to *dest* over a pooled keep-alive connection.
+
+    If an ETag was recorded when *dest* was last downloaded and the file's
+    size and mtime haven't changed since, the request is conditional and a
+    ``304`` leaves the file untouched.  A body shorter than its
+    ``Content-Length`` raises and leaves *dest* as it was.
+    """
     dest.parent.mkdir(parents=True, exist_ok=True)
-    with urllib.request.urlopen(url, timeout=30) as resp:
-        with open(dest, "wb") as fh:
-            fh.write(resp.read())
+    # Drop the old tag until the new body is fully written, so an
+    # interrupted download is never mistaken for an up-to-date file.
+    record = _ETAGS.pop(url, None)
+    headers = None
+    if record is not None and record.get("etag") and record.get("file") == _file_signature(dest):
+        headers = {"If-None-Match": record["etag"]}
+    try:
+        resp, finish = _open_url(url, headers)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304 and headers:
+            _ETAGS[url] = record
+            return
+        raise
+    try:
+        # Reads of a body cut short by the server just end early, so check
+        # the length ourselves before the file replaces the installed copy
+        _stream_to_file(resp, dest, _content_length(resp))
+    finally:
+        finish()
+    # Only reached once the body has been verified and moved into place
+    new_etag = resp.headers.get("ETag")
+    signature = _file_signature(dest)
+    if signature is not None:
+        _ETAGS[url] = {"etag": new_etag, "file": signature}
+
+
+def load_etags(path: Path) -> None:
+    """Load ETags recorded by a previous run (missing or invalid file is ignored)."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return
+    # Entries from older installers (bare tag strings) are dropped
+    if isinstance(data, dict):
+        _ETAGS.update(
+            (url, record) for url, record in data.items()
+            if isinstance(record, dict) and isinstance(record.get("etag"), (str, type(None)))
+        )
+
+
+def save_etags(path: Path) -> None:
+    """Persist the ETags seen during this run (best effort)."""
+    try:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(_ETAGS, fh, sort_keys=True)
+    except OSError:
+        pass
+
+
+def download_many(
+    tasks: List[Tuple[str, Path]],
+    jobs: int,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Dict[Path, Exception]:
+    """Download every ``(url, dest)`` in *tasks* concurrently.
+
+    Best-effort: failures are collected instead of raised.  Returns a mapping
+    of *dest* to the exception for every download that failed.
+    *on_progress* is called from this thread with the completed-task count.
+    """
+    failures: Dict[Path, Exception] = {}
+    if not tasks:
+        return failures
+    pool = ThreadPoolExecutor(max_workers=max(1, min(jobs, len(tasks))))
+    futures: Dict[Any, Path] = {}
+    try:
+        for url, dest in tasks:
+            futures[pool.submit(download, url, dest)] = dest
+        for done, future in enumerate(as_completed(futures), 1):
+            exc = future.exception()
+            if exc is not None:
+                failures[futures[future]] = exc
+            if on_progress is not None:
+                on_progress(done)
+    except BaseException:
+        # Ctrl-C: drop the queued downloads instead of waiting for all of
+        # them (cancel_futures needs 3.9, so cancel by hand)
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
+        raise
+    pool.shutdown()
+    return failures
+
+
+# In-kernel copy primitives, f(src_fd, dst_fd, count) -> bytes copied, best first
+_KERNEL_COPIES: List[Callable[[int, int, int], int]] = []
+if hasattr(os, "copy_file_range"):
+    _KERNEL_COPIES.append(lambda src_fd, dst_fd, count: os.copy_file_range(src_fd, dst_fd, count))
+if hasattr(os, "sendfile"):
+    _KERNEL_COPIES.append(lambda src_fd, dst_fd, count: os.sendfile(dst_fd, src_fd, None, count))
+
+
+def fast_copyfile(src: Path, dst: Path) -> None:
+    """Copy the contents of *src* to *dst*, in-kernel where possible.
+
+    Uses ``CopyFileW`` on Windows.  On Linux it prefers
+    ``os.copy_file_range``, which shares extents instead of copying data on
+    reflink-capable filesystems (btrfs, XFS), then ``os.sendfile``.  Falls
+    back to ``shutil.copyfile`` if these are unavailable or fail.
+    """
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            if ctypes.windll.kernel32.CopyFileW(str(src), str(dst), False):
+                return
+        except Exception:
+            pass
+    elif sys.platform.startswith("linux"):
+        for copy_range in _KERNEL_COPIES:
+            try:
+                with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        sent = copy_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if sent == 0:
+                            break
+                        remaining -= sent
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+    shutil.copyfile(src, dst)
+
+
+def fast_copy2(src: Path, dst: Path) -> None:
+    """Like ``shutil.copy2`` but copies the data with :func:`fast_copyfile`."""
+    fast_copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+def copy_many(
+    pairs: List[Tuple[Path, Path]],
+    jobs: int,
+    copy_fn: Callable[[Path, Path], Any] = fast_copy2,
+) -> None:
+    """Copy every ``(src, dst)`` in *pairs* concurrently with *copy_fn*.
+
+    Destination directories must already exist.  Re-raises the first error.
+    """
+    if not pairs:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(pairs)))) as pool:
+        futures = [pool.submit(copy_fn, src, dst) for src, dst in pairs]
+        for future in futures:
+            future.result()
 
 
 def copy_if_exists(src: Path, dst: Path) -> bool:
@@ -87,13 +458,89 @@ def copy_if_exists(src: Path, dst: Path) -> bool:
     return False
 
 
-def fetch_registry() -> Optional[Dict[str, Any]]:
-    """Fetch the pack registry JSON.  Returns None on failure."""
+# Hook commands installed by peon-ping (or the notify.sh it replaces)
+_OWN_HOOK_RE = re.compile(r"notify\.sh|peon\.sh|peon\.py")
+
+
+def read_settings(path: Path) -> Dict[str, Any]:
+    """Load Claude Code's *settings.json*, or ``{}`` if it does not exist."""
+    if not path.exists():
+        return {}
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def write_settings(path: Path, settings: Dict[str, Any]) -> None:
+    """Write *settings* to *path* as 2-space-indented JSON.
+
+    Nothing is written when the file already has exactly this content;
+    otherwise it is replaced atomically, so an interrupted install never
+    leaves a truncated settings.json.
+    """
+    if orjson is not None:
+        blob = orjson.dumps(settings, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        blob = (json.dumps(settings, indent=2) + "\n").encode("utf-8")
+    # Write through a symlinked settings.json (e.g. dotfile managers)
+    target = Path(os.path.realpath(path))
     try:
-        with urllib.request.urlopen(REGISTRY_URL, timeout=15) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        if target.read_bytes() == blob:
+            return
+    except OSError:
+        target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(blob)
+    try:
+        shutil.copymode(target, tmp)
+    except OSError:
+        pass
+    os.replace(tmp, target)
+
+
+def fetch_registry(cache_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Fetch the pack registry JSON.  Returns None on failure.
+
+    With *cache_path*, the last registry fetched and its ETag are kept
+    there: an unchanged registry costs a ``304``, and the cached copy is
+    also used when the registry can't be reached.
+    """
+    cached: Dict[str, Any] = {}
+    if cache_path is not None:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as fh:
+                cached = json.load(fh)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(cached, dict) or not isinstance(cached.get("registry"), dict):
+            cached = {}
+
+    headers = {"Accept-Encoding": "gzip"}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    try:
+        resp, finish = _open_url(REGISTRY_URL, headers)
+        try:
+            body = resp.read()
+            if resp.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            etag = resp.headers.get("ETag")
+        finally:
+            finish()
+        registry = json.loads(body.decode("utf-8"))
     except Exception:
-        return None
+        # Includes the 304 Not Modified raised as HTTPError
+        return cached.get("registry")
+
+    if cache_path is not None and etag and isinstance(registry, dict):
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as fh:
+                json.dump({"etag": etag, "registry": registry}, fh)
+        except OSError:
+            pass
+    return registry
 
 
 def get_pack_names_from_registry(registry_data: Dict[str, Any]) -> List[str]:
@@ -101,25 +548,211 @@ def get_pack_names_from_registry(registry_data: Dict[str, Any]) -> List[str]:
     return [p["name"] for p in registry_data.get("packs", [])]
 
 
+def index_registry(
+    registry_data: Optional[Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Map pack name -> registry entry (first entry wins, as before)."""
+    pack_index: Dict[str, Dict[str, Any]] = {}
+    if registry_data is not None:
+        for pack_entry in registry_data.get("packs", []):
+            pack_index.setdefault(pack_entry["name"], pack_entry)
+    return pack_index
+
+
 def get_pack_source(
-    pack_name: str, registry_data: Optional[Dict[str, Any]]
+    pack_name: str, pack_index: Dict[str, Dict[str, Any]]
 ) -> Tuple[str, str, str]:
     """Return (source_repo, source_ref, source_path) for a pack.
 
     Falls back to FALLBACK_REPO / FALLBACK_REF when registry data is
     unavailable or the pack is not found.
     """
-    if registry_data is not None:
-        for pack_entry in registry_data.get("packs", []):
-            if pack_entry["name"] == pack_name:
-                return (
-                    pack_entry.get("source_repo", FALLBACK_REPO),
-                    pack_entry.get("source_ref", FALLBACK_REF),
-                    pack_entry.get("source_path", pack_name),
-                )
+    pack_entry = pack_index.get(pack_name)
+    if pack_entry is not None:
+        return (
+            pack_entry.get("source_repo", FALLBACK_REPO),
+            pack_entry.get("source_ref", FALLBACK_REF),
+            pack_entry.get("source_path", pack_name),
+        )
     return (FALLBACK_REPO, FALLBACK_REF, pack_name)
 
 
+def fetch_pack_archive(
+    source_repo: str,
+    source_ref: str,
+    pack_paths: Dict[str, str],
+    packs_dir: Path,
+) -> List[str]:
+    """Extract several packs from one GitHub tarball of *source_repo*.
+
+    *pack_paths* maps pack name to its ``source_path`` inside the repo.
+    The archive is streamed and only each pack's ``openpeon.json`` and
+    ``sounds/*`` entries are written under *packs_dir*; a pack's old sounds
+    are removed when its first entry arrives.  Returns the packs whose
+    manifest was found; the caller falls back to per-file downloads for
+    the rest.
+
+    The archive's ETag is recorded along with the manifest and sound files
+    of every pack extracted from it, and the packs it lacked.  While all of *pack_paths*
+    are still exactly as that extraction left them, the request is
+    conditional and a ``304`` skips extraction altogether.
+    """
+    url = f"{CODELOAD_BASE}/{source_repo}/tar.gz/{source_ref}"
+    record = _ETAGS.pop(url, None)
+    headers = None
+    if record is not None and record.get("etag") and _archive_packs_current(
+        record, pack_paths, packs_dir
+    ):
+        headers = {"If-None-Match": record["etag"]}
+    try:
+        resp, finish = _open_url(url, headers)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304 and headers:
+            _ETAGS[url] = record
+            return [pack for pack in pack_paths if pack in record["packs"]]
+        raise
+
+    prefixes = {
+        (f"{path}/" if path else ""): pack for pack, path in pack_paths.items()
+    }
+    found: List[str] = []
+    cleared: set = set()
+    sound_names: Dict[str, List[str]] = {}
+    try:
+        with tarfile.open(fileobj=resp, mode="r|gz") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                # Strip the "<repo>-<ref>/" directory GitHub prepends
+                rel = member.name.split("/", 1)[-1]
+                for prefix, pack in prefixes.items():
+                    if not rel.startswith(prefix):
+                        continue
+                    inner = rel[len(prefix):]
+                    if inner == "openpeon.json":
+                        dest = packs_dir / pack / "openpeon.json"
+                        found.append(pack)
+                    elif inner.startswith("sounds/") and "/" not in inner[len("sounds/"):]:
+                        dest = packs_dir / pack / "sounds" / inner[len("sounds/"):]
+                        sound_names.setdefault(pack, []).append(dest.name)
+                    else:
+                        continue
+                    if pack not in cleared:
+                        sounds_dir = packs_dir / pack / "sounds"
+                        shutil.rmtree(sounds_dir, ignore_errors=True)
+                        sounds_dir.mkdir(parents=True, exist_ok=True)
+                        cleared.add(pack)
+                    src = tar.extractfile(member)
+                    if src is not None:
+                        _stream_to_file(src, dest, member.size)
+                    break
+    except BaseException:
+        # Discard partial extraction; the per-file fallback redoes it
+        for pack in cleared:
+            sounds_dir = packs_dir / pack / "sounds"
+            shutil.rmtree(sounds_dir, ignore_errors=True)
+            sounds_dir.mkdir(parents=True, exist_ok=True)
+        raise
+    finally:
+        finish()
+
+    etag = resp.headers.get("ETag")
+    if etag:
+        _ETAGS[url] = {
+            "etag": etag,
+            "packs": {
+                pack: {
+                    "path": pack_paths[pack],
+                    "manifest": _file_signature(packs_dir / pack / "openpeon.json"),
+                    "sounds": {
+                        name: _file_signature(packs_dir / pack / "sounds" / name)
+                        for name in sound_names.get(pack, [])
+                    },
+                }
+                for pack in found
+            },
+            "missing": {
+                pack: path for pack, path in pack_paths.items() if pack not in found
+            },
+        }
+    return found
+
+
+def _archive_packs_current(
+    record: Dict[str, Any], pack_paths: Dict[str, str], packs_dir: Path
+) -> bool:
+    """Return True if every pack in *pack_paths* is as the recorded extraction left it.
+
+    That covers the manifest and every extracted sound file: a missing or
+    modified file means the archive has to be fetched again.
+    """
+    extracted = record.get("packs")
+    missing = record.get("missing")
+    if not isinstance(extracted, dict) or not isinstance(missing, dict):
+        return False
+    for pack, path in pack_paths.items():
+        # Not in the archive last time either; the per-file fallback has it
+        if pack not in extracted and missing.get(pack) == path:
+            continue
+        entry = extracted.get(pack)
+        if not isinstance(entry, dict) or entry.get("path") != path:
+            return False
+        signature = _file_signature(packs_dir / pack / "openpeon.json")
+        if signature is None or entry.get("manifest") != signature:
+            return False
+        sounds = entry.get("sounds")
+        if not isinstance(sounds, dict):
+            return False
+        sounds_dir = packs_dir / pack / "sounds"
+        for name, recorded in sounds.items():
+            signature = _file_signature(sounds_dir / name)
+            if signature is None or signature != recorded:
+                return False
+    return True
+
+
+def manifest_sound_files(manifest_path: Path) -> List[str]:
+    """Return every sound ``file`` reference in a pack manifest, in order.
+
+    Streams the manifest with ijson when it is installed, so only the
+    ``file`` strings are materialised.  Raises ``ValueError`` on bad JSON.
+    """
+    if ijson is not None:
+        with open(manifest_path, "rb") as fh:
+            try:
+                # Category names contain dots, so match on the prefix ends
+                return [
+                    value
+                    for prefix, event, value in ijson.parse(fh)
+                    if event == "string"
+                    and prefix.startswith("categories.")
+                    and prefix.endswith(".sounds.item.file")
+                ]
+            except ijson.JSONError as exc:
+                raise ValueError(str(exc)) from exc
+    with open(manifest_path, "r", encoding="utf-8") as fh:
+        manifest_data = json.load(fh)
+    # Skip entries without a string "file", exactly as the ijson path does
+    return [
+        s["file"]
+        for cat in manifest_data.get("categories", {}).values()
+        for s in cat.get("sounds", [])
+        if isinstance(s, dict) and isinstance(s.get("file"), str)
+    ]
+
+
+def list_sound_files(sound_dir: Path) -> List[str]:
+    """Return the names of the sound files in *sound_dir* (one readdir)."""
+    try:
+        with os.scandir(sound_dir) as entries:
+            return [
+                entry.name for entry in entries
+                if entry.name.lower().endswith(SOUND_EXTENSIONS) and entry.is_file()
+            ]
+    except OSError:
+        return []
+
+
 def pack_base_url(source_repo: str, source_ref: str, source_path: str) -> str:
     """Build the raw GitHub base URL for a pack's files."""
     base = f"https://raw.githubusercontent.com/{source_repo}/{source_ref}"
@@ -128,6 +761,21 @@ def pack_base_url(source_repo: str, source_ref: str, source_path: str) -> str:
     return base
 
 
+def powershell_play_script(win_path: str) -> str:
+    """Return a PowerShell snippet that plays *win_path* once and exits.
+
+    Uses WPF's MediaPlayer for every format: it is the only built-in player
+    with a volume control, so the test sound plays at 0.3 like on Linux.
+    """
+    return (
+        f"Add-Type -AssemblyName PresentationCore; "
+        f"$p = New-Object System.Windows.Media.MediaPlayer; "
+        f"$p.Open([Uri]::new('file:///{win_path}')); "
+        f"$p.Volume = 0.3; Start-Sleep -Milliseconds 200; "
+        f"$p.Play(); Start-Sleep -Seconds 3; $p.Close()"
+    )
+
+
 # ---------------------------------------------------------------------------
 # Main installer
 # ---------------------------------------------------------------------------
@@ -136,14 +784,26 @@ def main() -> None:
     local_mode = "--local" in sys.argv
     install_all = "--all" in sys.argv
     custom_packs_csv = ""
+    # --jobs=N wins over PEON_PING_PARALLEL; a bad env value is ignored
+    jobs = DEFAULT_JOBS
+    env_jobs = os.environ.get("PEON_PING_PARALLEL", "")
+    if env_jobs.isdigit() and int(env_jobs) > 0:
+        jobs = int(env_jobs)
     for arg in sys.argv[1:]:
         if arg.startswith("--packs="):
             custom_packs_csv = arg[len("--packs="):]
+        elif arg.startswith("--jobs="):
+            try:
+                jobs = max(1, int(arg[len("--jobs="):]))
+            except ValueError:
+                print(f"Error: invalid --jobs value '{arg[len('--jobs='):]}'")
+                sys.exit(1)
 
+    home = Path.home()
     if local_mode:
         base_dir = Path.cwd() / ".claude"
     else:
-        base_dir = Path(os.environ.get("CLAUDE_CONFIG_DIR", str(Path.home() / ".claude")))
+        base_dir = Path(os.environ.get("CLAUDE_CONFIG_DIR", str(home / ".claude")))
 
     install_dir = base_dir / "hooks" / "peon-ping"
     settings_path = base_dir / "settings.json"
@@ -172,26 +832,22 @@ def main() -> None:
         sys.exit(1)
 
     if PLATFORM == "mac":
-        if shutil.which("afplay") is None:
+        if _which("afplay") is None:
             print("Error: afplay is required (should be built into macOS)")
             sys.exit(1)
     elif PLATFORM == "wsl":
-        if shutil.which("powershell.exe") is None:
+        if _which("powershell.exe") is None:
             print("Error: powershell.exe is required (should be available in WSL)")
             sys.exit(1)
-        if shutil.which("wslpath") is None:
+        if _which("wslpath") is None:
             print("Error: wslpath is required (should be built into WSL)")
             sys.exit(1)
     elif PLATFORM == "windows":
-        if shutil.which("powershell") is None:
+        if _which("powershell") is None:
             print("Error: PowerShell is required (should be built into Windows 10+)")
             sys.exit(1)
     elif PLATFORM == "linux":
-        linux_player = ""
-        for cmd in ("pw-play", "paplay", "ffplay", "mpv", "aplay"):
-            if shutil.which(cmd):
-                linux_player = cmd
-                break
+        linux_player = detect_linux_player()
         if not linux_player:
             print("Error: no supported audio player found.")
             print(
@@ -200,7 +856,7 @@ def main() -> None:
             )
             sys.exit(1)
         print(f"Audio player: {linux_player}")
-        if shutil.which("notify-send"):
+        if _which("notify-send"):
             print("Desktop notifications: notify-send")
         else:
             print(
@@ -221,7 +877,7 @@ def main() -> None:
 
     if not is_local_clone:
         print("\nFetching pack registry...")
-        registry_data = fetch_registry()
+        registry_data = fetch_registry(install_dir / REGISTRY_CACHE_FILE)
         if registry_data is not None:
             all_packs = get_pack_names_from_registry(registry_data)
             print(f"Registry: {len(all_packs)} packs available")
@@ -251,15 +907,25 @@ def main() -> None:
             packs = list(FALLBACK_PACKS)
 
     # --- Create pack directories ---
+    # Create the shared parent once; each pack then needs only two mkdirs.
+    packs_root = install_dir / "packs"
+    packs_root.mkdir(parents=True, exist_ok=True)
     for pack in packs:
-        (install_dir / "packs" / pack / "sounds").mkdir(parents=True, exist_ok=True)
+        pack_dir = os.path.join(packs_root, pack)
+        for path in (pack_dir, os.path.join(pack_dir, "sounds")):
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                pass
 
     # --- Install / update core files ---
     if is_local_clone:
         print("\nInstalling from local clone...")
 
-        # Copy packs
+        # Copy packs.  Walk the tree once, create every destination directory
+        # up front, then copy the files concurrently.
         src_packs = script_dir / "packs"
+        pack_copies: List[Tuple[Path, Path]] = []
         if src_packs.exists():
             dst_packs = install_dir / "packs"
             # Copy each pack individually to preserve any user additions
@@ -268,32 +934,46 @@ def main() -> None:
                     dst = dst_packs / item.name
                     if dst.exists():
                         shutil.rmtree(dst)
-                    shutil.copytree(item, dst)
+                    for dirpath, _dirnames, filenames in os.walk(item, followlinks=True):
+                        dst_dir = dst / Path(dirpath).relative_to(item)
+                        dst_dir.mkdir(parents=True, exist_ok=True)
+                        pack_copies.extend(
+                            (Path(dirpath) / name, dst_dir / name) for name in filenames
+                        )
 
-        # Copy core files
+        # Core files, adapters and icon (copystat keeps the executable bit)
+        core_copies: List[Tuple[Path, Path]] = []
+        copied_core: List[str] = []
         for filename in ("peon.sh", "peon.py", "peon.bat", "relay.sh",
                          "completions.bash", "completions.fish", "VERSION",
                          "uninstall.sh"):
             src = script_dir / filename
             if src.exists():
-                shutil.copy2(src, install_dir / filename)
-                print(f"  Copied {filename}")
+                core_copies.append((src, install_dir / filename))
+                copied_core.append(filename)
 
-        # Copy adapters
         adapters_src = script_dir / "adapters"
         if adapters_src.is_dir():
             adapters_dst = install_dir / "adapters"
             adapters_dst.mkdir(parents=True, exist_ok=True)
             for adapter_file in adapters_src.glob("*.sh"):
-                shutil.copy2(adapter_file, adapters_dst / adapter_file.name)
-            print("  Copied adapters/")
+                core_copies.append((adapter_file, adapters_dst / adapter_file.name))
 
-        # Copy peon icon
         icon_src = script_dir / "docs" / "peon-icon.png"
         if icon_src.exists():
             icon_dst = install_dir / "docs"
             icon_dst.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(icon_src, icon_dst / "peon-icon.png")
+            core_copies.append((icon_src, icon_dst / "peon-icon.png"))
+
+        # Sound files don't need their metadata preserved
+        copy_many(pack_copies, COPY_JOBS, fast_copyfile)
+        copy_many(core_copies, COPY_JOBS)
+
+        for filename in copied_core:
+            print(f"  Copied {filename}")
+        if adapters_src.is_dir():
+            print("  Copied adapters/")
+        if icon_src.exists():
             print("  Copied docs/peon-icon.png")
 
         # Copy config only on fresh install
@@ -301,133 +981,191 @@ def main() -> None:
             copy_if_exists(script_dir / "config.json", install_dir / "config.json")
     else:
         print("\nDownloading from GitHub...")
+        etags_path = install_dir / ETAGS_FILE
+        load_etags(etags_path)
 
-        # Download core files
+        # Packs are fetched as one tarball per source repo/ref when enough of
+        # that repo is wanted (see ARCHIVE_MIN_SHARE); core files, adapters
+        # and the icon download concurrently alongside them.
         core_files = (
             "peon.sh", "peon.py", "peon.bat", "relay.sh",
             "completions.bash", "completions.fish", "VERSION",
             "uninstall.sh", "uninstall.py",
         )
-        for filename in core_files:
-            try:
-                download(f"{REPO_BASE}/{filename}", install_dir / filename)
-            except Exception as exc:
-                print(f"  Warning: failed to download {filename}: {exc}")
-        print(f"  Core files: {len(core_files)} downloaded")
-
-        # Download adapters
-        adapters_dst = install_dir / "adapters"
-        adapters_dst.mkdir(parents=True, exist_ok=True)
-        for adapter_name in ("codex.sh", "cursor.sh"):
-            try:
-                download(
-                    f"{REPO_BASE}/adapters/{adapter_name}",
-                    adapters_dst / adapter_name,
-                )
-            except Exception:
-                pass  # Adapters are optional; fail silently
+        core_tasks = [
+            (f"{REPO_BASE}/{filename}", install_dir / filename)
+            for filename in core_files
+        ]
+        # Adapters and icon are optional; failures are ignored
+        optional_tasks = [
+            (f"{REPO_BASE}/adapters/{adapter_name}", install_dir / "adapters" / adapter_name)
+            for adapter_name in ("codex.sh", "cursor.sh")
+        ]
+        optional_tasks.append(
+            (f"{REPO_BASE}/docs/peon-icon.png", install_dir / "docs" / "peon-icon.png")
+        )
 
-        # Download peon icon
-        icon_dst = install_dir / "docs"
-        icon_dst.mkdir(parents=True, exist_ok=True)
-        try:
-            download(
-                f"{REPO_BASE}/docs/peon-icon.png",
-                icon_dst / "peon-icon.png",
+        pack_index = index_registry(registry_data)
+        pack_sources: Dict[str, Tuple[str, str, str]] = {
+            pack: get_pack_source(pack, pack_index) for pack in packs
+        }
+        # How many packs each repo/ref provides, to judge whether its
+        # tarball is worth fetching for the packs requested from it
+        repo_pack_counts: Dict[Tuple[str, str], int] = {}
+        for pack in all_packs:
+            source_repo, source_ref, _ = get_pack_source(pack, pack_index)
+            key = (source_repo, source_ref)
+            repo_pack_counts[key] = repo_pack_counts.get(key, 0) + 1
+        archive_groups: Dict[Tuple[str, str], Dict[str, str]] = {}
+        for pack in packs:
+            source_repo, source_ref, source_path = pack_sources[pack]
+            archive_groups.setdefault((source_repo, source_ref), {})[pack] = source_path
+        # Packs left out here simply take the per-file path below
+        archive_groups = {
+            key: group for key, group in archive_groups.items()
+            if len(group) >= ARCHIVE_MIN_SHARE * repo_pack_counts.get(key, 0)
+        }
+
+        archived: set[str] = set()
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(archive_groups)))) as pool:
+            archive_futures = [
+                pool.submit(
+                    fetch_pack_archive, repo, ref, group, install_dir / "packs"
+                )
+                for (repo, ref), group in archive_groups.items()
+            ]
+
+            failures = download_many(core_tasks + optional_tasks, jobs)
+            for filename, (_, dest) in zip(core_files, core_tasks):
+                if dest in failures:
+                    print(f"  Warning: failed to download {filename}: {failures[dest]}")
+            print(f"  Core files: {len(core_files)} downloaded")
+
+            for future in archive_futures:
+                try:
+                    archived.update(future.result())
+                except Exception:
+                    pass  # These packs fall back to per-file downloads
+        if archived:
+            print(f"  Packs: {len(archived)} extracted from archives")
+
+        # Fall back to per-file downloads for packs the archives missed
+        fallback_packs = [pack for pack in packs if pack not in archived]
+        old_manifests: Dict[str, Optional[bytes]] = {}
+        for pack in fallback_packs:
+            try:
+                old_manifests[pack] = (install_dir / "packs" / pack / "openpeon.json").read_bytes()
+            except OSError:
+                old_manifests[pack] = None
+        if fallback_packs:
+            print(f"  Downloading manifests for {len(fallback_packs)} packs...")
+        manifest_tasks = [
+            (
+                f"{pack_base_url(*pack_sources[pack])}/openpeon.json",
+                install_dir / "packs" / pack / "openpeon.json",
             )
-        except Exception:
-            pass  # Icon is optional; fail silently
+            for pack in fallback_packs
+        ]
+        failures = download_many(manifest_tasks, jobs)
 
-        # Download manifests and sounds from registry-resolved sources
-        print(f"  Downloading manifests for {len(packs)} packs...")
+        # Registry source_ref may reference a tag that predates a pack —
+        # retry failed manifests with the main branch as fallback.
         ref_overrides: Dict[str, str] = {}  # pack -> ref that actually worked
-        for pack in packs:
-            source_repo, source_ref, source_path = get_pack_source(
-                pack, registry_data
-            )
-            base_url = pack_base_url(source_repo, source_ref, source_path)
+        retry_tasks: List[Tuple[str, Path]] = []
+        retry_packs: List[str] = []
+        for pack, (_, dest) in zip(fallback_packs, manifest_tasks):
+            if dest not in failures:
+                continue
+            source_repo, source_ref, source_path = pack_sources[pack]
+            if source_ref != "main":
+                fallback_url = pack_base_url(source_repo, "main", source_path)
+                retry_tasks.append((f"{fallback_url}/openpeon.json", dest))
+                retry_packs.append(pack)
+            else:
+                print(f"  Warning: failed to download manifest for {pack}")
+        retry_failures = download_many(retry_tasks, jobs)
+        for pack, (_, dest) in zip(retry_packs, retry_tasks):
+            if dest in retry_failures:
+                print(f"  Warning: failed to download manifest for {pack}")
+            else:
+                ref_overrides[pack] = "main"
+
+        # Clear old sound files of packs whose manifest changed (fixes stale
+        # files after pack updates — matches upstream install.sh behaviour).
+        # Unchanged packs keep their sounds, which are then skipped below.
+        for pack in fallback_packs:
             try:
-                download(
-                    f"{base_url}/openpeon.json",
-                    install_dir / "packs" / pack / "openpeon.json",
-                )
-            except Exception:
-                # Registry source_ref may reference a tag that predates
-                # this pack — retry with the main branch as fallback.
-                if source_ref != "main":
-                    fallback_url = pack_base_url(
-                        source_repo, "main", source_path
-                    )
-                    try:
-                        download(
-                            f"{fallback_url}/openpeon.json",
-                            install_dir / "packs" / pack / "openpeon.json",
-                        )
-                        ref_overrides[pack] = "main"
-                    except Exception:
-                        print(
-                            f"  Warning: failed to download manifest for {pack}"
-                        )
-                else:
-                    print(f"  Warning: failed to download manifest for {pack}")
-
-        # Clear old sound files before downloading (fixes stale files after
-        # pack updates — matches upstream install.sh behaviour).
-        for pack in packs:
-            sounds_dir = install_dir / "packs" / pack / "sounds"
-            if sounds_dir.exists():
-                shutil.rmtree(sounds_dir)
-            sounds_dir.mkdir(parents=True, exist_ok=True)
-
-        # Build a list of all sound files to download so we can show progress
-        sound_downloads: List[Tuple[str, str, str]] = []  # (pack, filename, base_url)
-        for pack in packs:
+                new_manifest: Optional[bytes] = (
+                    install_dir / "packs" / pack / "openpeon.json"
+                ).read_bytes()
+            except OSError:
+                new_manifest = None
+            if new_manifest != old_manifests[pack]:
+                sounds_dir = install_dir / "packs" / pack / "sounds"
+                shutil.rmtree(sounds_dir, ignore_errors=True)
+                sounds_dir.mkdir(parents=True, exist_ok=True)
+
+        # Build the full (url, dest) task list across all packs up front so
+        # the progress bar knows the total.  Keyed by dest, which dedupes
+        # repeated files within a pack while keeping manifest order.
+        sound_urls: Dict[Path, str] = {}
+        for pack in fallback_packs:
             manifest_path = install_dir / "packs" / pack / "openpeon.json"
             if not manifest_path.exists():
                 continue
             try:
-                with open(manifest_path, "r", encoding="utf-8") as fh:
-                    manifest_data = json.load(fh)
-            except (json.JSONDecodeError, OSError):
+                file_refs = manifest_sound_files(manifest_path)
+            except (ValueError, OSError, KeyError, TypeError):
                 continue
-            source_repo, source_ref, source_path = get_pack_source(
-                pack, registry_data
-            )
+            source_repo, source_ref, source_path = pack_sources[pack]
             effective_ref = ref_overrides.get(pack, source_ref)
-            base_url = pack_base_url(source_repo, effective_ref, source_path)
-            try:
-                seen: set[str] = set()
-                for cat in manifest_data.get("categories", {}).values():
-                    for s in cat.get("sounds", []):
-                        file_ref: str = s["file"]
-                        # openpeon.json uses "sounds/file.wav"; legacy uses "file.wav"
-                        fname = file_ref.split("/")[-1]
-                        if fname not in seen:
-                            seen.add(fname)
-                            sound_downloads.append((pack, fname, base_url))
-            except (KeyError, TypeError):
-                pass
-
-        # Download sound files with progress bar, skipping existing files
-        total_sounds = len(sound_downloads)
+            sounds_url = f"{pack_base_url(source_repo, effective_ref, source_path)}/sounds"
+            sounds_dir = install_dir / "packs" / pack / "sounds"
+            for file_ref in file_refs:
+                # openpeon.json uses "sounds/file.wav"; legacy uses "file.wav"
+                fname = file_ref.rsplit("/", 1)[-1]
+                sound_urls.setdefault(sounds_dir / fname, f"{sounds_url}/{fname}")
+
+        # Download sound files concurrently with progress bar, skipping
+        # files a previous run downloaded completely and nothing has touched
+        # since.  Anything else present (e.g. a partial local-clone copy) is
+        # fetched again.
+        total_sounds = len(sound_urls)
         bar_width = 30
-        download_warnings: List[str] = []
+        sound_tasks: List[Tuple[str, Path]] = []
         skipped_count = 0
-        for idx, (pack, fname, base_url) in enumerate(sound_downloads, 1):
+        for dest_path, url in sound_urls.items():
+            if is_downloaded(url, dest_path):
+                skipped_count += 1
+                continue
+            sound_tasks.append((url, dest_path))
+
+        # Redraw at most ~20 times a second (always for the first and last
+        # update) so hundreds of small files don't flood slow terminals
+        last_drawn = -1.0
+
+        def show_progress(done: int) -> None:
+            nonlocal last_drawn
+            idx = skipped_count + done
+            now = time.monotonic()
+            if done and idx < total_sounds and now - last_drawn < 0.05:
+                return
+            last_drawn = now
             filled = int(bar_width * idx / total_sounds) if total_sounds else 0
             bar = "#" * filled + "-" * (bar_width - filled)
             sys.stderr.write(
                 f"\r  Sounds: [{bar}] {idx}/{total_sounds}"
             )
             sys.stderr.flush()
-            dest_path = install_dir / "packs" / pack / "sounds" / fname
-            if dest_path.exists():
-                skipped_count += 1
-                continue
-            try:
-                download(f"{base_url}/sounds/{fname}", dest_path)
-            except Exception:
-                download_warnings.append(f"{pack}/sounds/{fname}")
+
+        if total_sounds:
+            show_progress(0)
+        sound_failures = download_many(sound_tasks, jobs, show_progress)
+        download_warnings = [
+            dest.relative_to(install_dir / "packs").as_posix()
+            for _, dest in sound_tasks
+            if dest in sound_failures
+        ]
         if total_sounds:
             sys.stderr.write("\n")
             sys.stderr.flush()
@@ -444,6 +1182,8 @@ def main() -> None:
             except Exception:
                 pass
 
+        save_etags(etags_path)
+
     # Make peon.sh executable on Unix
     peon_sh = install_dir / "peon.sh"
     if peon_sh.exists() and os.name != "nt":
@@ -459,28 +1199,28 @@ def main() -> None:
         hook_cmd = str(install_dir / "peon.sh")
 
     skill_src = script_dir / "skills" / "peon-ping-toggle" / "SKILL.md" if is_local_clone else None
+    skill_file = skill_dir / "SKILL.md"
+
+    def render_skill(content: str) -> str:
+        if not local_mode:
+            return content
+        return content.replace(
+            'bash "${CLAUDE_CONFIG_DIR:-$HOME/.claude}"/hooks/peon-ping/peon.sh',
+            f"bash {hook_cmd}",
+        )
 
     if skill_src and skill_src.exists():
-        shutil.copy2(skill_src, skill_dir / "SKILL.md")
         if local_mode:
-            skill_file = skill_dir / "SKILL.md"
-            content = skill_file.read_text(encoding="utf-8")
-            content = content.replace(
-                'bash "${CLAUDE_CONFIG_DIR:-$HOME/.claude}"/hooks/peon-ping/peon.sh',
-                f"bash {hook_cmd}",
+            # Template the copy in memory rather than copy, re-read, rewrite
+            skill_file.write_text(
+                render_skill(skill_src.read_text(encoding="utf-8")), encoding="utf-8"
             )
-            skill_file.write_text(content, encoding="utf-8")
+        else:
+            shutil.copy2(skill_src, skill_file)
     elif not is_local_clone:
         try:
-            download(f"{REPO_BASE}/skills/peon-ping-toggle/SKILL.md", skill_dir / "SKILL.md")
-            if local_mode:
-                skill_file = skill_dir / "SKILL.md"
-                content = skill_file.read_text(encoding="utf-8")
-                content = content.replace(
-                    'bash "${CLAUDE_CONFIG_DIR:-$HOME/.claude}"/hooks/peon-ping/peon.sh',
-                    f"bash {hook_cmd}",
-                )
-                skill_file.write_text(content, encoding="utf-8")
+            content = fetch(f"{REPO_BASE}/skills/peon-ping-toggle/SKILL.md").decode("utf-8")
+            skill_file.write_text(render_skill(content), encoding="utf-8")
         except Exception:
             print("Warning: failed to download skill file")
 
@@ -505,32 +1245,35 @@ def main() -> None:
         except Exception:
             print("Warning: failed to download config skill file")
 
-    # --- Shell aliases (global install, Unix only) ---
+    # --- Shell aliases and tab completions (global install, Unix only) ---
     if not local_mode and os.name != "nt":
         alias_line = f'alias peon="bash {install_dir}/peon.sh"'
-        for rcfile_path in (Path.home() / ".zshrc", Path.home() / ".bashrc"):
-            if rcfile_path.exists():
-                content = rcfile_path.read_text(encoding="utf-8")
-                if "alias peon=" not in content:
-                    with open(rcfile_path, "a", encoding="utf-8") as fh:
-                        fh.write(f"\n# peon-ping quick controls\n{alias_line}\n")
-                    print(f"Added peon alias to {rcfile_path.name}")
-
-        # Tab completions
         completion_line = (
             f"[ -f {install_dir}/completions.bash ] && "
             f"source {install_dir}/completions.bash"
         )
-        for rcfile_path in (Path.home() / ".zshrc", Path.home() / ".bashrc"):
-            if rcfile_path.exists():
-                content = rcfile_path.read_text(encoding="utf-8")
-                if "peon-ping/completions.bash" not in content:
-                    with open(rcfile_path, "a", encoding="utf-8") as fh:
-                        fh.write(f"{completion_line}\n")
-                    print(f"Added tab completion to {rcfile_path.name}")
+        for rcfile_path in (home / ".zshrc", home / ".bashrc"):
+            if not rcfile_path.exists():
+                continue
+            # Read each rc file once and append everything missing in one write
+            content = rcfile_path.read_text(encoding="utf-8")
+            additions = ""
+            added: List[str] = []
+            if "alias peon=" not in content:
+                additions += f"\n# peon-ping quick controls\n{alias_line}\n"
+                added.append(f"Added peon alias to {rcfile_path.name}")
+            if "peon-ping/completions.bash" not in content:
+                additions += f"{completion_line}\n"
+                added.append(f"Added tab completion to {rcfile_path.name}")
+            if additions:
+                with open(rcfile_path, "a", encoding="utf-8") as fh:
+                    fh.write(additions)
+                for line in added:
+                    print(line)
 
     # --- Fish shell ---
-    fish_config = Path.home() / ".config" / "fish" / "config.fish"
+    fish_dir = home / ".config" / "fish"
+    fish_config = fish_dir / "config.fish"
     if fish_config.exists():
         content = fish_config.read_text(encoding="utf-8")
         if "function peon" not in content:
@@ -541,9 +1284,9 @@ def main() -> None:
                 )
             print("Added peon function to config.fish")
 
-    fish_comp_dir = Path.home() / ".config" / "fish" / "completions"
+    fish_comp_dir = fish_dir / "completions"
     fish_comp_src = install_dir / "completions.fish"
-    if (Path.home() / ".config" / "fish").exists() and fish_comp_src.exists():
+    if fish_dir.exists() and fish_comp_src.exists():
         fish_comp_dir.mkdir(parents=True, exist_ok=True)
         shutil.copy2(fish_comp_src, fish_comp_dir / "peon.fish")
         print(f"Installed fish completions to {fish_comp_dir / 'peon.fish'}")
@@ -552,10 +1295,7 @@ def main() -> None:
     print()
     for pack in packs:
         sound_dir = install_dir / "packs" / pack / "sounds"
-        sound_count = 0
-        if sound_dir.exists():
-            for ext in ("*.wav", "*.mp3", "*.ogg"):
-                sound_count += len(list(sound_dir.glob(ext)))
+        sound_count = len(list_sound_files(sound_dir))
         if sound_count == 0:
             print(f"[{pack}] Warning: No sound files found!")
         else:
@@ -586,11 +1326,7 @@ def main() -> None:
         else:
             hook_cmd_setting = f"python {install_dir / 'peon.py'}"
 
-    if settings_path.exists():
-        with open(settings_path, "r", encoding="utf-8") as fh:
-            settings = json.load(fh)
-    else:
-        settings = {}
+    settings = read_settings(settings_path)
 
     hooks = settings.setdefault("hooks", {})
 
@@ -612,9 +1348,7 @@ def main() -> None:
         event_hooks = [
             h for h in event_hooks
             if not any(
-                "notify.sh" in hk.get("command", "")
-                or "peon.sh" in hk.get("command", "")
-                or "peon.py" in hk.get("command", "")
+                _OWN_HOOK_RE.search(hk.get("command", ""))
                 for hk in h.get("hooks", [])
             )
         ]
@@ -623,10 +1357,7 @@ def main() -> None:
 
     settings["hooks"] = hooks
 
-    settings_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(settings_path, "w", encoding="utf-8") as fh:
-        json.dump(settings, fh, indent=2)
-        fh.write("\n")
+    write_settings(settings_path, settings)
 
     print(f"Hooks registered for: {', '.join(events)}")
 
@@ -648,12 +1379,15 @@ def main() -> None:
 
     pack_sound_dir = install_dir / "packs" / active_pack / "sounds"
     test_sound = None
-    if pack_sound_dir.exists():
-        for ext in ("*.wav", "*.mp3", "*.ogg"):
-            sounds = sorted(pack_sound_dir.glob(ext))
-            if sounds:
-                test_sound = sounds[0]
-                break
+    sound_names = list_sound_files(pack_sound_dir)
+    if sound_names:
+        # First file of the most preferred format (.wav, then .mp3, then .ogg)
+        test_sound = pack_sound_dir / min(
+            sound_names,
+            key=lambda name: (
+                SOUND_EXTENSIONS.index(os.path.splitext(name)[1].lower()), name
+            ),
+        )
 
     if test_sound:
         try:
@@ -667,11 +1401,7 @@ def main() -> None:
                 subprocess.run(
                     [
                         "powershell.exe", "-NoProfile", "-NonInteractive", "-Command",
-                        f"Add-Type -AssemblyName PresentationCore; "
-                        f"$p = New-Object System.Windows.Media.MediaPlayer; "
-                        f"$p.Open([Uri]::new('file:///{wpath}')); "
-                        f"$p.Volume = 0.3; Start-Sleep -Milliseconds 200; "
-                        f"$p.Play(); Start-Sleep -Seconds 3; $p.Close()",
+                        powershell_play_script(wpath),
                     ],
                     timeout=10,
                     stdout=subprocess.DEVNULL,
@@ -682,46 +1412,40 @@ def main() -> None:
                 subprocess.run(
                     [
                         "powershell", "-NoProfile", "-NonInteractive", "-Command",
-                        f"Add-Type -AssemblyName PresentationCore; "
-                        f"$p = New-Object System.Windows.Media.MediaPlayer; "
-                        f"$p.Open([Uri]::new('file:///{wpath}')); "
-                        f"$p.Volume = 0.3; Start-Sleep -Milliseconds 200; "
-                        f"$p.Play(); Start-Sleep -Seconds 3; $p.Close()",
+                        powershell_play_script(wpath),
                     ],
                     timeout=10,
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL,
                 )
             elif PLATFORM == "linux":
-                for cmd in ("pw-play", "paplay", "ffplay", "mpv", "aplay"):
-                    if shutil.which(cmd):
-                        if cmd == "pw-play":
-                            subprocess.run(
-                                ["pw-play", "--volume=0.3", str(test_sound)],
-                                timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                            )
-                        elif cmd == "paplay":
-                            pa_vol = int(0.3 * 65536)
-                            subprocess.run(
-                                ["paplay", f"--volume={pa_vol}", str(test_sound)],
-                                timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                            )
-                        elif cmd == "ffplay":
-                            subprocess.run(
-                                ["ffplay", "-nodisp", "-autoexit", "-volume", "30", str(test_sound)],
-                                timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                            )
-                        elif cmd == "mpv":
-                            subprocess.run(
-                                ["mpv", "--no-video", "--volume=30", str(test_sound)],
-                                timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                            )
-                        elif cmd == "aplay":
-                            subprocess.run(
-                                ["aplay", "-q", str(test_sound)],
-                                timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                            )
-                        break
+                cmd = detect_linux_player()
+                if cmd == "pw-play":
+                    subprocess.run(
+                        ["pw-play", "--volume=0.3", str(test_sound)],
+                        timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    )
+                elif cmd == "paplay":
+                    pa_vol = int(0.3 * 65536)
+                    subprocess.run(
+                        ["paplay", f"--volume={pa_vol}", str(test_sound)],
+                        timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    )
+                elif cmd == "ffplay":
+                    subprocess.run(
+                        ["ffplay", "-nodisp", "-autoexit", "-volume", "30", str(test_sound)],
+                        timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    )
+                elif cmd == "mpv":
+                    subprocess.run(
+                        ["mpv", "--no-video", "--volume=30", str(test_sound)],
+                        timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    )
+                elif cmd == "aplay":
+                    subprocess.run(
+                        ["aplay", "-q", str(test_sound)],
+                        timeout=10, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    )
             print("Sound working!")
         except Exception as exc:
             print(f"Warning: Sound test failed: {exc}")
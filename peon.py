@@ -6,9 +6,10 @@ Cross-platform Python version converted from peon.sh.
 Supports macOS, WSL, native Windows, Linux, SSH, and devcontainers.
 """
 
+import copy
+import functools
 import json
 import os
-import platform
 import random
 import re
 import shutil
@@ -17,10 +18,19 @@ import subprocess
 import sys
 import threading
 import time
-import urllib.parse
-import urllib.request
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson  # Optional: faster config/state/manifest JSON on every hook
+except ImportError:
+    orjson = None
+
+# http.client and urllib (urllib.request pulls in email and ssl) are imported
+# inside the functions that talk to the network, so hooks that only play a
+# local sound don't pay for them at startup.
+if TYPE_CHECKING:
+    import http.client
 
 
 # ---------------------------------------------------------------------------
@@ -34,18 +44,20 @@ def detect_platform() -> str:
         One of 'mac', 'ssh', 'wsl', 'devcontainer', 'windows', 'linux',
         or 'unknown'.
     """
-    system = platform.system()
+    # sys.platform is fixed at build time; platform.system() costs an import
+    system = sys.platform
 
-    if system == "Darwin":
+    if system == "darwin":
         if os.environ.get("SSH_CONNECTION") or os.environ.get("SSH_CLIENT"):
             return "ssh"
         return "mac"
-    elif system == "Windows":
+    elif system == "win32":
         return "windows"
-    elif system == "Linux":
+    elif system.startswith("linux"):
         try:
-            with open("/proc/version", "r") as fh:
-                if "microsoft" in fh.read().lower():
+            # The "Microsoft" marker sits in the first line of the banner
+            with open("/proc/version", "rb") as fh:
+                if b"microsoft" in fh.read(256).lower():
                     return "wsl"
         except Exception:
             pass
@@ -83,6 +95,9 @@ STATE: Path = PEON_DIR / ".state.json"
 PAUSED_FILE: Path = PEON_DIR / ".paused"
 SOUND_PID_FILE: Path = PEON_DIR / ".sound.pid"
 ICON_PATH: Path = PEON_DIR / "docs" / "peon-icon.png"
+# String form for the per-hook pack lookups, which avoid building Path objects
+_PACKS_DIR: str = os.fspath(PEON_DIR / "packs")
+_PEON_DIR_PREFIX: str = os.fspath(PEON_DIR) + os.sep
 
 # ---------------------------------------------------------------------------
 # Cursor IDE event name mapping
@@ -101,17 +116,70 @@ _CURSOR_EVENT_MAP: Dict[str, str] = {
     "preCompact": "Stop",
 }
 
+# Permission modes that mark a session as a non-interactive agent
+_AGENT_MODES = frozenset(("delegate",))
+
+# CESP categories that can be switched off under config["categories"]
+_CATEGORIES = frozenset((
+    "session.start", "task.acknowledge", "task.complete", "task.error",
+    "input.required", "resource.limit", "user.spam",
+))
+
 # ---------------------------------------------------------------------------
 # Config / state helpers
 # ---------------------------------------------------------------------------
 
 
-def load_config() -> dict:
-    """Load configuration from *config.json*."""
-    with open(CONFIG, "r", encoding="utf-8") as fh:
+def _read_json(path: Union[str, Path]) -> Any:
+    """Parse the JSON file at *path* (with orjson when it is installed)."""
+    if orjson is not None:
+        with open(path, "rb") as fh:
+            return orjson.loads(fh.read())
+    with open(path, "r", encoding="utf-8") as fh:
         return json.load(fh)
 
 
+def _write_json(path: Union[str, Path], data: Any, indent: bool = False) -> None:
+    """Write *data* to *path* as JSON, 2-space indented if *indent*."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        with open(path, "wb") as fh:
+            fh.write(orjson.dumps(data, option=option))
+        return
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2 if indent else None)
+
+
+# (st_mtime_ns, st_size) -> parsed config; callers always get a deep copy
+_CONFIG_CACHE: Optional[Tuple[Tuple[int, int], dict]] = None
+
+
+def _config_key() -> Tuple[int, int]:
+    st = os.stat(CONFIG)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_config() -> dict:
+    """Load configuration from *config.json*.
+
+    Re-parses only when the file changed since the last load or save.
+    """
+    global _CONFIG_CACHE
+    key = _config_key()
+    if _CONFIG_CACHE is None or _CONFIG_CACHE[0] != key:
+        _CONFIG_CACHE = (key, _read_json(CONFIG))
+    return copy.deepcopy(_CONFIG_CACHE[1])
+
+
+def _is_false(value: Any) -> bool:
+    """Return *True* if a config flag is switched off.
+
+    Same rule the shell runtime uses: ``false`` or any-case ``"false"``
+    disables; every other value (including a missing key) leaves it on.
+    """
+    return value is False or (isinstance(value, str) and value.lower() == "false")
+
+
 def load_config_safe() -> dict:
     """Load config, returning ``{}`` on any error."""
     try:
@@ -122,34 +190,103 @@ def load_config_safe() -> dict:
 
 def save_config(config: dict) -> None:
     """Persist *config* to *config.json*."""
+    global _CONFIG_CACHE
     CONFIG.parent.mkdir(parents=True, exist_ok=True)
-    with open(CONFIG, "w", encoding="utf-8") as fh:
-        json.dump(config, fh, indent=2)
+    _CONFIG_CACHE = None
+    _write_json(CONFIG, config, indent=True)
+    try:
+        _CONFIG_CACHE = (_config_key(), copy.deepcopy(config))
+    except OSError:
+        pass
 
 
 def load_state_safe() -> dict:
     """Load runtime state, returning ``{}`` on any error."""
     try:
-        with open(STATE, "r", encoding="utf-8") as fh:
-            return json.load(fh)
+        return _read_json(STATE)
     except Exception:
         return {}
 
 
+# Pauses between os.replace attempts while .state.json is held open (Windows)
+_STATE_REPLACE_DELAYS = (0.005, 0.01, 0.02, 0.0)
+
+
 def save_state(state: dict) -> None:
     """Persist runtime *state* to *.state.json*."""
     STATE.parent.mkdir(parents=True, exist_ok=True)
-    with open(STATE, "w", encoding="utf-8") as fh:
-        json.dump(state, fh)
+    # Write a sibling temp file and rename it over the old state, so a hook
+    # killed mid-write never leaves a torn .state.json behind
+    tmp_path = f"{STATE}.{os.getpid()}.tmp"
+    try:
+        _write_json(tmp_path, state)
+        for delay in _STATE_REPLACE_DELAYS:
+            try:
+                os.replace(tmp_path, STATE)
+                return
+            except PermissionError:
+                # Windows won't replace a file another process has open,
+                # e.g. a concurrent hook reading state; retry briefly
+                time.sleep(delay)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    try:
+        os.unlink(tmp_path)
+    except OSError:
+        pass
+    # Still locked: fall back to writing in place, as before
+    _write_json(STATE, state)
+
+
+# ---------------------------------------------------------------------------
+# Background work
+# ---------------------------------------------------------------------------
+
+_BACKGROUND_THREADS: List[threading.Thread] = []
+
+
+def _start_background(target: Callable[..., None], *args: Any) -> None:
+    """Run ``target(*args)`` on a daemon thread.
+
+    Daemon threads (rather than a thread pool, whose workers are joined at
+    interpreter exit) keep a slow relay or push service from holding the
+    hook open past its own work.
+    """
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    _BACKGROUND_THREADS.append(thread)
+
+
+def _wait_background(timeout: float) -> None:
+    """Join background threads for at most *timeout* seconds in total.
+
+    Returns as soon as every thread has finished (most only need to
+    ``Popen`` a player), and immediately when none were started.
+    """
+    deadline = time.monotonic() + timeout
+    for thread in _BACKGROUND_THREADS:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        thread.join(remaining)
 
 
 # ---------------------------------------------------------------------------
 # Linux audio backend detection
 # ---------------------------------------------------------------------------
 
+# PATH lookups don't change while the hook runs; memoize them.  Test-mode
+# disable markers are checked separately so they stay dynamic.
+_which = functools.lru_cache(maxsize=None)(shutil.which)
+
+
 def _player_available(cmd: str) -> bool:
     """Return *True* if *cmd* is on ``PATH`` (and not disabled in test mode)."""
-    if shutil.which(cmd) is None:
+    if _which(cmd) is None:
         return False
     # Respect test-mode disable markers (mirrors bash ``PEON_TEST`` logic)
     if os.environ.get("PEON_TEST") == "1":
@@ -187,16 +324,20 @@ def detect_linux_player() -> str:
 
 def _kill_previous_sound() -> None:
     """Kill any previously playing peon-ping sound process."""
+    # Common case: no PID file.  A failed open is the only syscall made.
     try:
-        if SOUND_PID_FILE.exists():
-            old_pid_str = SOUND_PID_FILE.read_text().strip()
-            if old_pid_str:
-                old_pid = int(old_pid_str)
-                try:
-                    os.kill(old_pid, signal.SIGTERM)
-                except (OSError, ProcessLookupError):
-                    pass
-            SOUND_PID_FILE.unlink(missing_ok=True)
+        with open(SOUND_PID_FILE, "rb") as fh:
+            old_pid_str = fh.read(32).strip()
+    except OSError:
+        return
+    try:
+        if old_pid_str:
+            old_pid = int(old_pid_str)
+            try:
+                os.kill(old_pid, signal.SIGTERM)
+            except (OSError, ProcessLookupError):
+                pass
+        SOUND_PID_FILE.unlink(missing_ok=True)
     except Exception:
         pass
 
@@ -209,26 +350,52 @@ def _save_sound_pid(pid: int) -> None:
         pass
 
 
+# Player process started by the most recent play_sound(), if any
+_LAST_PLAYER: Optional[subprocess.Popen] = None
+
+
+def _track_player(proc: subprocess.Popen) -> None:
+    """Remember *proc* as the current player and save its PID for cleanup."""
+    global _LAST_PLAYER
+    _LAST_PLAYER = proc
+    _save_sound_pid(proc.pid)
+
+
 # ---------------------------------------------------------------------------
 # Audio playback
 # ---------------------------------------------------------------------------
 
 def play_sound(file_path: Path, volume: float) -> None:
     """Play *file_path* in the background at the given *volume* (0.0 - 1.0)."""
+    global _LAST_PLAYER
     _kill_previous_sound()
+    _LAST_PLAYER = None
 
-    def _play() -> None:
-        if PLATFORM == "mac":
-            _play_mac(file_path, volume)
-        elif PLATFORM in ("wsl", "windows"):
-            _play_windows(file_path, volume)
-        elif PLATFORM in ("devcontainer", "ssh"):
-            _play_relay(file_path, volume)
-        elif PLATFORM == "linux":
-            _play_linux(file_path, volume)
-
-    thread = threading.Thread(target=_play, daemon=True)
-    thread.start()
+    backend = _PLAY_BACKENDS.get(PLATFORM)
+    if backend is None:
+        return
+    _start_background(backend, file_path, volume)
+
+
+def _wait_for_player(timeout: float) -> None:
+    """Block until the last played sound ends, for at most *timeout* seconds.
+
+    Falls back to sleeping out the full *timeout* when there is no local
+    player process to wait on (relay playback, synchronous test mode).
+    """
+    deadline = time.monotonic() + timeout
+    _wait_background(timeout)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return
+    proc = _LAST_PLAYER
+    if proc is None:
+        time.sleep(remaining)
+        return
+    try:
+        proc.wait(timeout=remaining)
+    except subprocess.TimeoutExpired:
+        pass
 
 
 def _play_mac(file_path: Path, volume: float) -> None:
@@ -239,21 +406,37 @@ def _play_mac(file_path: Path, volume: float) -> None:
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
-        _save_sound_pid(proc.pid)
+        _track_player(proc)
     except Exception:
         pass
 
 
+# WSL path -> Windows path translations made by this process
+_WSLPATH_CACHE: Dict[str, str] = {}
+
+
+def _wslpath_w(path: str) -> str:
+    """Return ``wslpath -w`` for *path*, running the tool once per path.
+
+    Empty results (a failed translation) are not cached.
+    """
+    windows_path = _WSLPATH_CACHE.get(path)
+    if windows_path is None:
+        windows_path = subprocess.run(
+            ["wslpath", "-w", path],
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        if windows_path:
+            _WSLPATH_CACHE[path] = windows_path
+    return windows_path
+
+
 def _play_windows(file_path: Path, volume: float) -> None:
     """Play via PowerShell ``MediaPlayer`` (WSL or native Windows)."""
     if PLATFORM == "wsl":
         try:
-            result = subprocess.run(
-                ["wslpath", "-w", str(file_path)],
-                capture_output=True,
-                text=True,
-            )
-            windows_path = result.stdout.strip()
+            windows_path = _wslpath_w(str(file_path))
         except Exception:
             return
     else:
@@ -281,34 +464,65 @@ def _play_windows(file_path: Path, volume: float) -> None:
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
-        _save_sound_pid(proc.pid)
+        _track_player(proc)
     except Exception:
         pass
 
 
-def _play_relay(file_path: Path, volume: float) -> None:
-    """Play via HTTP relay for SSH/devcontainer environments."""
+# Sound and notification relay calls from one hook share a connection
+_RELAY_CONN: Optional["http.client.HTTPConnection"] = None
+_RELAY_LOCK = threading.Lock()
+
+
+def _relay_request(
+    method: str,
+    path: str,
+    body: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    """Send one request to the audio relay, reusing an open connection.
+
+    The connection is dropped on any error so the next call reconnects.
+    """
+    global _RELAY_CONN
+    import http.client
+
     relay_host_default = (
         "host.docker.internal" if PLATFORM == "devcontainer" else "localhost"
     )
     relay_host: str = os.environ.get("PEON_RELAY_HOST", relay_host_default)
     relay_port: str = os.environ.get("PEON_RELAY_PORT", "19998")
 
+    with _RELAY_LOCK:
+        conn = _RELAY_CONN
+        if conn is None or (conn.host, str(conn.port)) != (relay_host, relay_port):
+            conn = http.client.HTTPConnection(relay_host, int(relay_port), timeout=5)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            conn.getresponse().read()
+            _RELAY_CONN = conn
+        except Exception:
+            conn.close()
+            _RELAY_CONN = None
+            raise
+
+
+def _play_relay(file_path: Path, volume: float) -> None:
+    """Play via HTTP relay for SSH/devcontainer environments."""
     # Send relative path from PEON_DIR
-    rel_path = str(file_path).replace(str(PEON_DIR) + os.sep, "").replace("\\", "/")
+    rel_path = os.fspath(file_path)
+    if rel_path.startswith(_PEON_DIR_PREFIX):
+        rel_path = rel_path[len(_PEON_DIR_PREFIX):]
+    rel_path = rel_path.replace("\\", "/")
+    import urllib.parse
+
     encoded_path = urllib.parse.quote(rel_path)
-    url = f"http://{relay_host}:{relay_port}/play?file={encoded_path}"
 
     try:
-        req = urllib.request.Request(url, headers={"X-Volume": str(volume)})
-        if os.environ.get("PEON_TEST") == "1":
-            urllib.request.urlopen(req, timeout=5)
-        else:
-            # Fire-and-forget in background
-            threading.Thread(
-                target=lambda: urllib.request.urlopen(req, timeout=5),
-                daemon=True,
-            ).start()
+        # play_sound() already runs this on a background thread
+        _relay_request(
+            "GET", f"/play?file={encoded_path}", headers={"X-Volume": str(volume)}
+        )
     except Exception:
         pass
 
@@ -343,32 +557,34 @@ def _play_linux(file_path: Path, volume: float) -> None:
 
         if use_bg:
             proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            _save_sound_pid(proc.pid)
+            _track_player(proc)
         else:
             subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except Exception:
         pass
 
 
+# Platform -> playback backend, resolved with one dict lookup per sound
+_PLAY_BACKENDS = {
+    "mac": _play_mac,
+    "wsl": _play_windows,
+    "windows": _play_windows,
+    "devcontainer": _play_relay,
+    "ssh": _play_relay,
+    "linux": _play_linux,
+}
+
+
 # ---------------------------------------------------------------------------
 # Notifications
 # ---------------------------------------------------------------------------
 
 def send_notification(msg: str, title: str, color: str = "red") -> None:
     """Send a desktop notification in the background."""
-
-    def _notify() -> None:
-        if PLATFORM == "mac":
-            _notify_mac(msg, title, color)
-        elif PLATFORM in ("wsl", "windows"):
-            _notify_windows(msg, title, color)
-        elif PLATFORM in ("devcontainer", "ssh"):
-            _notify_relay(msg, title, color)
-        elif PLATFORM == "linux":
-            _notify_linux(msg, title, color)
-
-    thread = threading.Thread(target=_notify, daemon=True)
-    thread.start()
+    backend = _NOTIFY_BACKENDS.get(PLATFORM)
+    if backend is None:
+        return
+    _start_background(backend, msg, title, color)
 
 
 def _notify_mac(msg: str, title: str, color: str) -> None:
@@ -390,7 +606,7 @@ def _notify_mac(msg: str, title: str, color: str) -> None:
             sys.stdout.flush()
         else:
             # Prefer terminal-notifier with icon if available
-            if shutil.which("terminal-notifier") and ICON_PATH.exists():
+            if _which("terminal-notifier") and ICON_PATH.exists():
                 subprocess.Popen(
                     [
                         "terminal-notifier",
@@ -417,46 +633,14 @@ def _notify_mac(msg: str, title: str, color: str) -> None:
         pass
 
 
-def _notify_windows(msg: str, title: str, color: str) -> None:
-    """Send notification on Windows / WSL using PowerShell Forms."""
-    color_map: Dict[str, Tuple[int, int, int]] = {
-        "red": (180, 0, 0),
-        "blue": (30, 80, 180),
-        "yellow": (200, 160, 0),
-    }
-    rgb_r, rgb_g, rgb_b = color_map.get(color, (180, 0, 0))
-
-    # Escape single quotes for PowerShell string literals
-    msg_escaped = msg.replace("'", "''")
-
-    # Resolve icon path for Windows
-    icon_win_path = ""
-    if ICON_PATH.exists():
-        if PLATFORM == "wsl":
-            try:
-                result = subprocess.run(
-                    ["wslpath", "-w", str(ICON_PATH)],
-                    capture_output=True, text=True,
-                )
-                icon_win_path = result.stdout.strip()
-            except Exception:
-                pass
-        else:
-            icon_win_path = str(ICON_PATH.resolve())
-
-    # Determine temp dir for popup slot stacking
-    slot_dir_expr_ps = "$env:TEMP\\peon-ping-popups"
-
-    # Build icon block for PowerShell
-    icon_block = ""
-    if icon_win_path:
-        icon_ps_path = icon_win_path.replace("'", "''")
-        icon_block = f"""
+# PowerShell popup used by _notify_windows(), built once at import.  The
+# ``%(name)s`` fields are filled per notification.
+_WIN_POPUP_ICON_BLOCK = """
             $iconLeft = 10
             $iconSize = 60
-            if (Test-Path '{icon_ps_path}') {{
+            if (Test-Path '%(icon_ps_path)s') {
               $pb = New-Object System.Windows.Forms.PictureBox
-              $pb.Image = [System.Drawing.Image]::FromFile('{icon_ps_path}')
+              $pb.Image = [System.Drawing.Image]::FromFile('%(icon_ps_path)s')
               $pb.SizeMode = 'Zoom'
               $pb.Size = New-Object System.Drawing.Size($iconSize, $iconSize)
               $pb.Location = New-Object System.Drawing.Point($iconLeft, 10)
@@ -465,32 +649,32 @@ def _notify_windows(msg: str, title: str, color: str) -> None:
               $label = New-Object System.Windows.Forms.Label
               $label.Location = New-Object System.Drawing.Point(($iconLeft + $iconSize + 5), 0)
               $label.Size = New-Object System.Drawing.Size((500 - $iconLeft - $iconSize - 15), 80)
-            }} else {{
+            } else {
               $label = New-Object System.Windows.Forms.Label
               $label.Dock = 'Fill'
-            }}"""
-    else:
-        icon_block = """
+            }"""
+
+_WIN_POPUP_LABEL_BLOCK = """
             $label = New-Object System.Windows.Forms.Label
             $label.Dock = 'Fill'"""
 
-    powershell_script = f"""
-        $slotDir = "{slot_dir_expr_ps}"
+_WIN_POPUP_SCRIPT = """
+        $slotDir = "$env:TEMP\\peon-ping-popups"
         New-Item -ItemType Directory -Force -Path $slotDir | Out-Null
         $slot = 0
-        while (Test-Path "$slotDir\\slot-$slot") {{
+        while (Test-Path "$slotDir\\slot-$slot") {
             $slot++
-        }}
+        }
         New-Item -ItemType Directory -Path "$slotDir\\slot-$slot" | Out-Null
         $yOffset = 40 + ($slot * 90)
 
         Add-Type -AssemblyName System.Windows.Forms
         Add-Type -AssemblyName System.Drawing
 
-        foreach ($screen in [System.Windows.Forms.Screen]::AllScreens) {{
+        foreach ($screen in [System.Windows.Forms.Screen]::AllScreens) {
             $form = New-Object System.Windows.Forms.Form
             $form.FormBorderStyle = 'None'
-            $form.BackColor = [System.Drawing.Color]::FromArgb({rgb_r}, {rgb_g}, {rgb_b})
+            $form.BackColor = [System.Drawing.Color]::FromArgb(%(rgb_r)s, %(rgb_g)s, %(rgb_b)s)
             $form.Size = New-Object System.Drawing.Size(500, 80)
             $form.TopMost = $true
             $form.ShowInTaskbar = $false
@@ -499,20 +683,61 @@ def _notify_windows(msg: str, title: str, color: str) -> None:
                 ($screen.WorkingArea.X + ($screen.WorkingArea.Width - 500) / 2),
                 ($screen.WorkingArea.Y + $yOffset)
             )
-            {icon_block}
-            $label.Text = '{msg_escaped}'
+            %(icon_block)s
+            $label.Text = '%(msg_escaped)s'
             $label.ForeColor = [System.Drawing.Color]::White
             $label.Font = New-Object System.Drawing.Font('Segoe UI', 16, [System.Drawing.FontStyle]::Bold)
             $label.TextAlign = 'MiddleCenter'
             $form.Controls.Add($label)
             $form.Show()
-        }}
+        }
 
         Start-Sleep -Seconds 4
         [System.Windows.Forms.Application]::Exit()
         Remove-Item "$slotDir\\slot-$slot" -Force -ErrorAction SilentlyContinue
     """
 
+
+_WIN_COLOR_MAP: Dict[str, Tuple[int, int, int]] = {
+    "red": (180, 0, 0),
+    "blue": (30, 80, 180),
+    "yellow": (200, 160, 0),
+}
+
+
+def _notify_windows(msg: str, title: str, color: str) -> None:
+    """Send notification on Windows / WSL using PowerShell Forms."""
+    rgb_r, rgb_g, rgb_b = _WIN_COLOR_MAP.get(color, _WIN_COLOR_MAP["red"])
+
+    # Escape single quotes for PowerShell string literals
+    msg_escaped = msg.replace("'", "''")
+
+    # Resolve icon path for Windows
+    icon_win_path = ""
+    if ICON_PATH.exists():
+        if PLATFORM == "wsl":
+            try:
+                icon_win_path = _wslpath_w(str(ICON_PATH))
+            except Exception:
+                pass
+        else:
+            icon_win_path = str(ICON_PATH.resolve())
+
+    if icon_win_path:
+        icon_block = _WIN_POPUP_ICON_BLOCK % {
+            "icon_ps_path": icon_win_path.replace("'", "''"),
+        }
+    else:
+        icon_block = _WIN_POPUP_LABEL_BLOCK
+
+    powershell_script = _WIN_POPUP_SCRIPT % {
+        "rgb_r": rgb_r,
+        "rgb_g": rgb_g,
+        "rgb_b": rgb_b,
+        "icon_block": icon_block,
+        "msg_escaped": msg_escaped,
+    }
+
     ps_exe = "powershell.exe" if PLATFORM == "wsl" else "powershell"
 
     try:
@@ -527,30 +752,20 @@ def _notify_windows(msg: str, title: str, color: str) -> None:
 
 def _notify_relay(msg: str, title: str, color: str) -> None:
     """Send notification via HTTP relay for SSH/devcontainer environments."""
-    relay_host_default = (
-        "host.docker.internal" if PLATFORM == "devcontainer" else "localhost"
-    )
-    relay_host: str = os.environ.get("PEON_RELAY_HOST", relay_host_default)
-    relay_port: str = os.environ.get("PEON_RELAY_PORT", "19998")
-
-    url = f"http://{relay_host}:{relay_port}/notify"
     payload = json.dumps({"title": title, "message": msg, "color": color}).encode("utf-8")
 
     try:
-        req = urllib.request.Request(
-            url,
-            data=payload,
+        _relay_request(
+            "POST", "/notify", body=payload,
             headers={"Content-Type": "application/json"},
-            method="POST",
         )
-        urllib.request.urlopen(req, timeout=5)
     except Exception:
         pass
 
 
 def _notify_linux(msg: str, title: str, color: str) -> None:
     """Send notification on Linux via ``notify-send``."""
-    if shutil.which("notify-send") is None:
+    if _which("notify-send") is None:
         return
 
     urgency = "critical" if color == "red" else "normal"
@@ -570,10 +785,25 @@ def _notify_linux(msg: str, title: str, color: str) -> None:
         pass
 
 
+# Platform -> desktop notification backend
+_NOTIFY_BACKENDS = {
+    "mac": _notify_mac,
+    "wsl": _notify_windows,
+    "windows": _notify_windows,
+    "devcontainer": _notify_relay,
+    "ssh": _notify_relay,
+    "linux": _notify_linux,
+}
+
+
 # ---------------------------------------------------------------------------
 # Mobile push notifications (ntfy / pushover / telegram)
 # ---------------------------------------------------------------------------
 
+# Notification color -> mobile push priority
+_MOBILE_PRIORITY_MAP: Dict[str, str] = {"red": "high", "yellow": "default", "blue": "low"}
+
+
 def send_mobile_notification(msg: str, title: str, color: str, config: dict) -> None:
     """Send push notification to phone via ntfy.sh, Pushover, or Telegram.
 
@@ -587,9 +817,7 @@ def send_mobile_notification(msg: str, title: str, color: str, config: dict) ->
         return
 
     def _send() -> None:
-        # Map color to priority
-        priority_map = {"red": "high", "yellow": "default", "blue": "low"}
-        priority = priority_map.get(color, "default")
+        priority = _MOBILE_PRIORITY_MAP.get(color, "default")
 
         try:
             if service == "ntfy":
@@ -601,8 +829,7 @@ def send_mobile_notification(msg: str, title: str, color: str, config: dict) ->
         except Exception:
             pass
 
-    thread = threading.Thread(target=_send, daemon=True)
-    thread.start()
+    _start_background(_send)
 
 
 def _mobile_ntfy(msg: str, title: str, priority: str, cfg: dict) -> None:
@@ -623,6 +850,8 @@ def _mobile_ntfy(msg: str, title: str, priority: str, cfg: dict) -> None:
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
+    import urllib.request
+
     req = urllib.request.Request(url, data=data, headers=headers)
     urllib.request.urlopen(req, timeout=10)
 
@@ -640,6 +869,9 @@ def _mobile_pushover(msg: str, title: str, priority: str, cfg: dict) -> None:
     elif priority == "low":
         po_priority = -1
 
+    import urllib.parse
+    import urllib.request
+
     data = urllib.parse.urlencode({
         "token": app_token,
         "user": user_key,
@@ -662,6 +894,9 @@ def _mobile_telegram(msg: str, title: str, cfg: dict) -> None:
     if not bot_token or not chat_id:
         return
 
+    import urllib.parse
+    import urllib.request
+
     text = f"{title}\n{msg}"
     url = (
         f"https://api.telegram.org/bot{bot_token}/sendMessage"
@@ -677,21 +912,26 @@ def _mobile_telegram(msg: str, title: str, cfg: dict) -> None:
 
 def terminal_is_focused() -> bool:
     """Return *True* if a terminal application is the frontmost window."""
-    if PLATFORM == "mac":
-        return _terminal_is_focused_mac()
-    elif PLATFORM == "linux":
-        return _terminal_is_focused_linux()
-    else:
-        # WSL / Windows / devcontainer / ssh: cannot detect or too slow
-        return False
+    # WSL / Windows / devcontainer / ssh: cannot detect or too slow
+    check = _FOCUS_CHECKS.get(PLATFORM)
+    return check() if check is not None else False
+
+
+_MAC_TERMINAL_APPS = frozenset((
+    "Terminal", "iTerm2", "Warp", "Alacritty",
+    "kitty", "WezTerm", "Ghostty",
+))
+
+# Substring match against the lower-cased X11 window title
+_TERM_NAME_RE = re.compile("|".join(map(re.escape, (
+    "terminal", "konsole", "alacritty", "kitty", "wezterm", "foot",
+    "tilix", "gnome-terminal", "xterm", "xfce4-terminal", "sakura",
+    "terminator", "st", "urxvt", "ghostty",
+))))
 
 
 def _terminal_is_focused_mac() -> bool:
     """Check focus on macOS via ``osascript``."""
-    terminal_apps = {
-        "Terminal", "iTerm2", "Warp", "Alacritty",
-        "kitty", "WezTerm", "Ghostty",
-    }
     try:
         result = subprocess.run(
             [
@@ -703,7 +943,7 @@ def _terminal_is_focused_mac() -> bool:
             text=True,
             timeout=2,
         )
-        return result.stdout.strip() in terminal_apps
+        return result.stdout.strip() in _MAC_TERMINAL_APPS
     except Exception:
         return False
 
@@ -712,7 +952,7 @@ def _terminal_is_focused_linux() -> bool:
     """Check focus on Linux via ``xdotool`` (X11 only)."""
     if os.environ.get("XDG_SESSION_TYPE") != "x11":
         return False
-    if shutil.which("xdotool") is None:
+    if _which("xdotool") is None:
         return False
 
     try:
@@ -723,16 +963,18 @@ def _terminal_is_focused_linux() -> bool:
             timeout=2,
         )
         win_name = result.stdout.strip().lower()
-        terminal_keywords = (
-            "terminal", "konsole", "alacritty", "kitty", "wezterm", "foot",
-            "tilix", "gnome-terminal", "xterm", "xfce4-terminal", "sakura",
-            "terminator", "st", "urxvt", "ghostty",
-        )
-        return any(kw in win_name for kw in terminal_keywords)
+        return _TERM_NAME_RE.search(win_name) is not None
     except Exception:
         return False
 
 
+# Platforms where terminal focus can be detected
+_FOCUS_CHECKS = {
+    "mac": _terminal_is_focused_mac,
+    "linux": _terminal_is_focused_linux,
+}
+
+
 # ---------------------------------------------------------------------------
 # Terminal title
 # ---------------------------------------------------------------------------
@@ -756,6 +998,29 @@ def set_terminal_title(title: str) -> None:
 # iTerm2 tab color (OSC 6)
 # ---------------------------------------------------------------------------
 
+_TAB_COLOR_DEFAULTS: Dict[str, List[int]] = {
+    "ready":          [65, 115, 80],   # muted green
+    "working":        [130, 105, 50],  # muted amber
+    "done":           [65, 100, 140],  # muted blue
+    "needs_approval": [150, 70, 70],   # muted red
+}
+
+
+def _tab_color_payload(rgb: List[int]) -> bytes:
+    """Encode the three OSC 6 sequences that set the tab to *rgb*."""
+    return (
+        f"\033]6;1;bg;red;brightness;{rgb[0]}\a"
+        f"\033]6;1;bg;green;brightness;{rgb[1]}\a"
+        f"\033]6;1;bg;blue;brightness;{rgb[2]}\a"
+    ).encode("utf-8")
+
+
+# Pre-encoded payloads for the default palette
+_TAB_COLOR_PAYLOADS: Dict[str, bytes] = {
+    k: _tab_color_payload(v) for k, v in _TAB_COLOR_DEFAULTS.items()
+}
+
+
 def set_tab_color(status: str, config: dict) -> None:
     """Set iTerm2 tab color based on status. Only works in iTerm2."""
     if os.environ.get("TERM_PROGRAM") != "iTerm.app":
@@ -763,31 +1028,26 @@ def set_tab_color(status: str, config: dict) -> None:
 
     tab_color_cfg: dict = config.get("tab_color", {})
     # Default enabled unless explicitly disabled
-    if str(tab_color_cfg.get("enabled", True)).lower() == "false":
+    if _is_false(tab_color_cfg.get("enabled", True)):
         return
 
-    default_colors: Dict[str, List[int]] = {
-        "ready":          [65, 115, 80],   # muted green
-        "working":        [130, 105, 50],  # muted amber
-        "done":           [65, 100, 140],  # muted blue
-        "needs_approval": [150, 70, 70],   # muted red
-    }
-    custom_colors: dict = tab_color_cfg.get("colors", {})
-    colors = {k: custom_colors.get(k, v) for k, v in default_colors.items()}
-
     status_key = status.replace(" ", "_") if status else ""
-    if status_key not in colors:
+    payload = _TAB_COLOR_PAYLOADS.get(status_key)
+    if payload is None:
         return
 
-    rgb = colors[status_key]
     try:
+        custom_colors: dict = tab_color_cfg.get("colors", {})
+        if status_key in custom_colors:
+            payload = _tab_color_payload(custom_colors[status_key])
         # Write to /dev/tty so escape sequences reach the terminal directly.
         # Claude Code captures hook stdout, so plain write would be swallowed.
-        with open("/dev/tty", "w") as tty:
-            tty.write(f"\033]6;1;bg;red;brightness;{rgb[0]}\a")
-            tty.write(f"\033]6;1;bg;green;brightness;{rgb[1]}\a")
-            tty.write(f"\033]6;1;bg;blue;brightness;{rgb[2]}\a")
-            tty.flush()
+        # All three OSC sequences go out in a single write().
+        fd = os.open("/dev/tty", os.O_WRONLY | getattr(os, "O_NOCTTY", 0))
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
     except Exception:
         pass
 
@@ -796,17 +1056,22 @@ def set_tab_color(status: str, config: dict) -> None:
 # Project name extraction
 # ---------------------------------------------------------------------------
 
+# Characters allowed in the project label shown in titles and notifications
+_PROJECT_UNSAFE_RE = re.compile(r"[^a-zA-Z0-9 ._-]")
+
+
 def get_project_name(cwd: str) -> str:
     """Derive a short project label from the working directory."""
     if not cwd:
         return "claude"
 
-    # Handle both Unix ``/`` and Windows ``\\`` separators
-    project = cwd.replace("\\", "/").rsplit("/", 1)[-1]
+    # Handle both Unix ``/`` and Windows ``\\`` separators without
+    # rewriting the whole path first
+    project = cwd[max(cwd.rfind("/"), cwd.rfind("\\")) + 1:]
     if not project:
         return "claude"
 
-    project = re.sub(r"[^a-zA-Z0-9 ._-]", "", project)
+    project = _PROJECT_UNSAFE_RE.sub("", project)
     return project or "claude"
 
 
@@ -825,41 +1090,93 @@ def _safe_print(text: str) -> None:
 
 def _list_pack_names() -> List[str]:
     """Return sorted list of installed pack directory names with manifests."""
-    packs_dir = PEON_DIR / "packs"
-    if not packs_dir.is_dir():
+    try:
+        # scandir reports entry types without a stat() per pack
+        with os.scandir(_PACKS_DIR) as entries:
+            pack_dirs = [entry.path for entry in entries if entry.is_dir()]
+    except OSError:
         return []
     names: List[str] = []
-    for d in sorted(os.listdir(packs_dir)):
-        pack_path = packs_dir / d
-        if pack_path.is_dir() and (
-            (pack_path / "openpeon.json").exists()
-            or (pack_path / "manifest.json").exists()
+    for pack_path in pack_dirs:
+        if os.path.exists(os.path.join(pack_path, "openpeon.json")) or os.path.exists(
+            os.path.join(pack_path, "manifest.json")
         ):
-            names.append(d)
-    return names
+            names.append(os.path.basename(pack_path))
+    return sorted(names)
+
+
+def _list_packs() -> List[Tuple[str, dict]]:
+    """Return ``(name, manifest)`` for installed packs with a readable manifest.
+
+    One walk over the packs dir; each manifest is opened once (and cached),
+    with no separate existence probe.
+    """
+    try:
+        with os.scandir(_PACKS_DIR) as entries:
+            names = sorted(entry.name for entry in entries if entry.is_dir())
+    except OSError:
+        return []
+    packs: List[Tuple[str, dict]] = []
+    for name in names:
+        manifest = _load_manifest(name)
+        if manifest:
+            packs.append((name, manifest))
+    return packs
+
+
+# Parsed manifests keyed by path; an entry is reused while the file's mtime
+# is unchanged, so CLI commands that touch a pack repeatedly parse it once.
+_MANIFEST_CACHE: Dict[str, Tuple[int, dict]] = {}
 
 
 def _load_manifest(pack_name: str) -> Optional[dict]:
     """Load openpeon.json or manifest.json for a pack."""
-    pack_dir = PEON_DIR / "packs" / pack_name
+    pack_dir = os.path.join(_PACKS_DIR, pack_name)
     for manifest_name in ("openpeon.json", "manifest.json"):
-        manifest_path = pack_dir / manifest_name
-        if manifest_path.exists():
-            try:
-                with open(manifest_path, "r", encoding="utf-8") as fh:
-                    return json.load(fh)
-            except Exception:
-                continue
+        manifest_path = os.path.join(pack_dir, manifest_name)
+        try:
+            mtime_ns = os.stat(manifest_path).st_mtime_ns
+        except OSError:
+            continue
+        cached = _MANIFEST_CACHE.get(manifest_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        try:
+            manifest = _read_json(manifest_path)
+        except Exception:
+            continue
+        _MANIFEST_CACHE[manifest_path] = (mtime_ns, manifest)
+        return manifest
     return None
 
 
+@functools.lru_cache(maxsize=None)
+def _pack_root(pack_name: str) -> str:
+    """Resolved pack directory plus a trailing separator, for containment checks."""
+    return os.path.realpath(os.path.join(_PACKS_DIR, pack_name)) + os.sep
+
+
+def _resolve_pack_sound(pack_name: str, file_ref: str) -> Optional[str]:
+    """Resolve a manifest *file_ref*, or ``None`` if it escapes the pack dir.
+
+    The candidate itself is still passed through realpath so a symlink
+    inside the pack cannot point outside it.
+    """
+    pack_dir = os.path.join(_PACKS_DIR, pack_name)
+    # openpeon.json uses paths like "sounds/file.wav"; legacy uses just "file.wav"
+    if "/" in file_ref:
+        candidate = os.path.realpath(os.path.join(pack_dir, file_ref))
+    else:
+        candidate = os.path.realpath(os.path.join(pack_dir, "sounds", file_ref))
+    return candidate if candidate.startswith(_pack_root(pack_name)) else None
+
+
 def pick_sound(pack_name: str, category: str, state: dict) -> Optional[Path]:
     """Pick a random sound file for *category*, avoiding the last-played file.
 
     Supports both ``openpeon.json`` (CESP standard) and legacy
     ``manifest.json`` formats.  Updates ``state['last_played']`` in-place.
     """
-    pack_dir = PEON_DIR / "packs" / pack_name
     manifest = _load_manifest(pack_name)
 
     if not manifest:
@@ -874,25 +1191,17 @@ def pick_sound(pack_name: str, category: str, state: dict) -> Optional[Path]:
     last_played: dict = state.get("last_played", {})
     last_file: str = last_played.get(category, "")
 
-    if len(sounds) > 1:
-        candidates = [s for s in sounds if s["file"] != last_file]
-    else:
-        candidates = sounds
-
-    pick = random.choice(candidates)
+    pick = random.choice(sounds)
+    if len(sounds) > 1 and pick["file"] == last_file:
+        # Redraw only on a repeat; the result is still uniform over the
+        # sounds that differ from the last one played
+        pick = random.choice([s for s in sounds if s["file"] != last_file])
     last_played[category] = pick["file"]
     state["last_played"] = last_played
 
-    # openpeon.json uses paths like "sounds/file.wav"; legacy uses just "file.wav"
-    file_ref: str = pick["file"]
-    if "/" in file_ref:
-        candidate = os.path.realpath(os.path.join(str(pack_dir), file_ref))
-    else:
-        candidate = os.path.realpath(os.path.join(str(pack_dir), "sounds", file_ref))
-
     # Path safety: reject paths outside the pack directory
-    pack_root = os.path.realpath(str(pack_dir)) + os.sep
-    if not candidate.startswith(pack_root):
+    candidate = _resolve_pack_sound(pack_name, pick["file"])
+    if candidate is None:
         return None
 
     sound_path = Path(candidate)
@@ -930,6 +1239,8 @@ def check_for_updates() -> None:
             local_version = ""
 
         try:
+            import urllib.request
+
             with urllib.request.urlopen(
                 "https://raw.githubusercontent.com/bwright2810/peon-ping/main/VERSION",
                 timeout=5,
@@ -950,22 +1261,23 @@ def check_for_updates() -> None:
             except Exception:
                 pass
 
-    thread = threading.Thread(target=_check, daemon=True)
-    thread.start()
+    _start_background(_check)
 
 
 def show_update_notice() -> None:
     """Print an update notice to *stderr* if one is pending."""
-    update_file = PEON_DIR / ".update_available"
-    if not update_file.exists():
+    # Read directly instead of probing with exists() first; a missing file
+    # is the common case
+    try:
+        new_version = (PEON_DIR / ".update_available").read_text().strip()
+    except Exception:
         return
 
     try:
-        new_version = update_file.read_text().strip()
-        version_file = PEON_DIR / "VERSION"
-        current_version = (
-            version_file.read_text().strip() if version_file.exists() else "?"
-        )
+        try:
+            current_version = (PEON_DIR / "VERSION").read_text().strip()
+        except FileNotFoundError:
+            current_version = "?"
         if new_version:
             _safe_print(
                 f"peon-ping update available: {current_version} \u2192 {new_version} "
@@ -987,9 +1299,12 @@ def route_event(
     state: dict,
     session_id: str,
     project: str,
+    now: Optional[float] = None,
 ) -> Optional[Tuple[str, str, str, bool, str, str, dict]]:
     """Route *event* to a sound category and notification parameters.
 
+    *now* is the event's timestamp; it defaults to the current time.
+
     Returns:
         ``(category, status, marker, notify, notify_color, msg, state_updates)``
         or *None* if the event should be ignored.
@@ -1001,6 +1316,8 @@ def route_event(
     notify_color = ""
     msg = ""
     state_updates: dict = {}
+    if now is None:
+        now = time.time()
 
     if event == "SessionStart":
         category = "session.start"
@@ -1010,10 +1327,9 @@ def route_event(
         status = "working"
 
         categories_cfg = config.get("categories", {})
-        if str(categories_cfg.get("user.spam", True)).lower() != "false":
+        if not _is_false(categories_cfg.get("user.spam", True)):
             annoyed_threshold = int(config.get("annoyed_threshold", 3))
             annoyed_window = float(config.get("annoyed_window_seconds", 10))
-            now = time.time()
 
             all_ts = state.get("prompt_timestamps", {})
             if isinstance(all_ts, list):
@@ -1032,7 +1348,7 @@ def route_event(
         silent_window = float(config.get("silent_window_seconds", 0))
         if silent_window > 0:
             prompt_starts = state.get("prompt_start_times", {})
-            prompt_starts[session_id] = time.time()
+            prompt_starts[session_id] = now
             state_updates["prompt_start_times"] = prompt_starts
 
     elif event == "Stop":
@@ -1043,7 +1359,7 @@ def route_event(
             prompt_starts = state.get("prompt_start_times", {})
             # start_time=0 when no prior prompt; 0 is falsy so short-circuits to not-silent
             start_time = prompt_starts.pop(session_id, 0)
-            if start_time and (time.time() - start_time) < silent_window:
+            if start_time and (now - start_time) < silent_window:
                 silent = True
             state_updates["prompt_start_times"] = prompt_starts
         status = "done"
@@ -1091,18 +1407,32 @@ def route_event(
 def handle_hook_event() -> None:
     """Read a hook-event JSON blob from *stdin* and respond with sound/notification."""
     try:
-        event_data = json.load(sys.stdin)
+        if orjson is not None:
+            event_data = orjson.loads(sys.stdin.buffer.read())
+        else:
+            event_data = json.load(sys.stdin)
     except (json.JSONDecodeError, ValueError):
         sys.exit(0)
 
+    # Cursor sends conversation_id instead of session_id
+    session_id: str = event_data.get("session_id", "") or event_data.get("conversation_id", "")
+
+    state = load_state_safe()
+
+    # --- Agent sessions are ignored outright; bail before loading config ---
+    # A short list is checked in place; it is only copied when a new
+    # agent session has to be recorded
+    agent_sessions: list = state.get("agent_sessions", [])
+    if session_id in agent_sessions:
+        sys.exit(0)
+
     paused = PAUSED_FILE.exists()
 
     config = load_config_safe()
-    state = load_state_safe()
     state_dirty = False
 
     # Check if enabled
-    if str(config.get("enabled", True)).lower() == "false":
+    if _is_false(config.get("enabled", True)):
         sys.exit(0)
 
     # Extract event details
@@ -1116,24 +1446,14 @@ def handle_hook_event() -> None:
     workspace_roots: list = event_data.get("workspace_roots", [])
     cwd: str = event_data.get("cwd", "") or (workspace_roots[0] if workspace_roots else "")
 
-    # Cursor sends conversation_id instead of session_id
-    session_id: str = event_data.get("session_id", "") or event_data.get("conversation_id", "")
-
     permission_mode: str = event_data.get("permission_mode", "")
 
-    # --- Agent detection ---
-    agent_modes = {"delegate"}
-    agent_sessions = set(state.get("agent_sessions", []))
-
-    if permission_mode and permission_mode in agent_modes:
-        agent_sessions.add(session_id)
-        state["agent_sessions"] = list(agent_sessions)
+    # --- Agent detection: record a new agent session and stay quiet ---
+    if permission_mode and permission_mode in _AGENT_MODES:
+        state["agent_sessions"] = agent_sessions + [session_id]
         save_state(state)
         sys.exit(0)
 
-    if session_id in agent_sessions:
-        sys.exit(0)
-
     # --- Pack rotation: pin a pack per session ---
     active_pack: str = config.get("active_pack", "peon")
     pack_rotation: list = config.get("pack_rotation", [])
@@ -1161,7 +1481,11 @@ def handle_hook_event() -> None:
     project = get_project_name(cwd)
 
     # --- Route event ---
-    result = route_event(event, notification_type, config, state, session_id, project)
+    # One timestamp for routing, Stop debounce and the replay window
+    now = time.time()
+    result = route_event(
+        event, notification_type, config, state, session_id, project, now=now
+    )
     if result is None:
         sys.exit(0)
 
@@ -1173,7 +1497,6 @@ def handle_hook_event() -> None:
 
     # --- Debounce rapid Stop events (5-second window) ---
     if event == "Stop":
-        now = time.time()
         last_stop = state.get("last_stop_time", 0)
         if now - last_stop < 5:
             category = ""
@@ -1184,7 +1507,6 @@ def handle_hook_event() -> None:
     # --- Suppress sounds during session replay (claude -c) ---
     # When continuing a session, Claude fires SessionStart then immediately
     # replays old events. Suppress all sounds within 3s of SessionStart.
-    now = time.time()
     if event == "SessionStart":
         session_starts = state.get("session_start_times", {})
         session_starts[session_id] = now
@@ -1198,16 +1520,11 @@ def handle_hook_event() -> None:
             notify = False
 
     # --- Check if category is enabled ---
-    cats = config.get("categories", {})
-    cat_enabled: Dict[str, bool] = {}
-    for c in (
-        "session.start", "task.acknowledge", "task.complete", "task.error",
-        "input.required", "resource.limit", "user.spam",
-    ):
-        cat_enabled[c] = str(cats.get(c, True)).lower() != "false"
-
-    if category and not cat_enabled.get(category, True):
-        category = ""
+    # Only the routed category's toggle matters; unknown categories stay on
+    if category in _CATEGORIES:
+        cats = config.get("categories", {})
+        if _is_false(cats.get(category, True)):
+            category = ""
 
     # --- Pick sound ---
     sound_file: Optional[Path] = None
@@ -1216,6 +1533,14 @@ def handle_hook_event() -> None:
         if sound_file:
             state_dirty = True
 
+    # --- Play sound ---
+    # Started before the state write and the title/notice output so the
+    # player launches while the rest of the hook runs
+    volume = float(config.get("volume", 0.5))
+    # pick_sound() only returns files it has just seen on disk
+    if sound_file:
+        play_sound(sound_file, volume)
+
     # --- Persist state ---
     if state_dirty:
         save_state(state)
@@ -1238,6 +1563,8 @@ def handle_hook_event() -> None:
             relay_host = os.environ.get("PEON_RELAY_HOST", relay_host_default)
             relay_port = os.environ.get("PEON_RELAY_PORT", "19998")
             try:
+                import urllib.request
+
                 urllib.request.urlopen(
                     f"http://{relay_host}:{relay_port}/health", timeout=2
                 )
@@ -1270,13 +1597,8 @@ def handle_hook_event() -> None:
     # --- iTerm2 tab color ---
     set_tab_color(status, config)
 
-    # --- Play sound ---
-    volume = float(config.get("volume", 0.5))
-    if sound_file and sound_file.exists():
-        play_sound(sound_file, volume)
-
     # --- Desktop notification ---
-    notifications_enabled = str(config.get("desktop_notifications", False)).lower() != "false"
+    notifications_enabled = not _is_false(config.get("desktop_notifications", False))
     if notify and not paused and notifications_enabled:
         if not terminal_is_focused():
             send_notification(msg, title, notify_color or "red")
@@ -1289,9 +1611,9 @@ def handle_hook_event() -> None:
     if notify and not paused and mobile_on:
         send_mobile_notification(msg, title, notify_color or "red", config)
 
-    # Wait for background threads (audio, notification) to finish spawning
-    # then allow the process to exit.  The daemon threads will be reaped.
-    time.sleep(0.05)
+    # Give background threads (audio, notification) up to 50ms to finish
+    # spawning, then allow the process to exit.  Daemon threads are reaped.
+    _wait_background(0.05)
 
 
 # ---------------------------------------------------------------------------
@@ -1328,7 +1650,7 @@ def handle_status() -> None:
 
     # Show desktop notification status
     config = load_config_safe()
-    desktop_notif = str(config.get("desktop_notifications", False)).lower() != "false"
+    desktop_notif = not _is_false(config.get("desktop_notifications", False))
     print(f"peon-ping: desktop notifications {'on' if desktop_notif else 'off'}")
 
     # Show mobile notification status
@@ -1376,12 +1698,10 @@ def handle_packs_cmd(args: List[str]) -> None:
 
     if sub == "list":
         active = load_config_safe().get("active_pack", "peon")
-        for name in _list_pack_names():
-            manifest = _load_manifest(name)
-            if manifest:
-                display = manifest.get("display_name", name)
-                marker_str = " *" if name == active else ""
-                _safe_print(f"  {name:24s} {display}{marker_str}")
+        for name, manifest in _list_packs():
+            display = manifest.get("display_name", name)
+            marker_str = " *" if name == active else ""
+            _safe_print(f"  {name:24s} {display}{marker_str}")
         sys.exit(0)
 
     elif sub == "use":
@@ -1389,6 +1709,8 @@ def handle_packs_cmd(args: List[str]) -> None:
             print("Usage: peon packs use <name>", file=sys.stderr)
             sys.exit(1)
         pack_arg = args[1]
+        # Match real directory entry names: a path probe would accept "PEON"
+        # on case-insensitive filesystems and save a non-canonical name
         names = _list_pack_names()
         if pack_arg not in names:
             print(f'Error: pack "{pack_arg}" not found.', file=sys.stderr)
@@ -1532,6 +1854,8 @@ def handle_mobile(args: List[str]) -> None:
         print(f"Install the ntfy app and subscribe to '{topic}'")
 
         # Send test notification
+        import urllib.request
+
         try:
             test_url = f"{server}/{topic}"
             data = "Mobile notifications connected!".encode("utf-8")
@@ -1685,7 +2009,6 @@ def handle_preview(args: List[str]) -> None:
     config = load_config_safe()
     volume = float(config.get("volume", 0.5))
     active_pack = config.get("active_pack", "peon")
-    pack_dir = PEON_DIR / "packs" / active_pack
 
     manifest = _load_manifest(active_pack)
     if not manifest:
@@ -1721,20 +2044,15 @@ def handle_preview(args: List[str]) -> None:
         file_ref = sound_entry.get("file", "")
         label = sound_entry.get("label", file_ref)
 
-        if "/" in file_ref:
-            fpath = os.path.realpath(os.path.join(str(pack_dir), file_ref))
-        else:
-            fpath = os.path.realpath(os.path.join(str(pack_dir), "sounds", file_ref))
-
         # Path safety check
-        pack_root = os.path.realpath(str(pack_dir)) + os.sep
-        if not fpath.startswith(pack_root):
+        fpath = _resolve_pack_sound(active_pack, file_ref)
+        if fpath is None:
             continue
 
         if os.path.isfile(fpath):
             _safe_print(f"  \u25b6 {label}")
             play_sound(Path(fpath), volume)
-            time.sleep(1.5)  # wait for sound to play before next
+            _wait_for_player(1.5)  # let the clip finish (up to 1.5s)
             time.sleep(0.3)  # extra gap between sounds
 
     sys.exit(0)
@@ -1744,49 +2062,15 @@ def handle_preview(args: List[str]) -> None:
 
 def handle_packs_legacy() -> None:
     """List available sound packs (marks the active one with ``*``). Legacy --packs."""
-    active = load_config_safe().get("active_pack", "peon")
-    for name in _list_pack_names():
-        manifest = _load_manifest(name)
-        if manifest:
-            display = manifest.get("display_name", name)
-            marker_str = " *" if name == active else ""
-            _safe_print(f"  {name:24s} {display}{marker_str}")
-    sys.exit(0)
+    handle_packs_cmd(["list"])
 
 
 def handle_pack_legacy(pack_name: Optional[str]) -> None:
     """Switch to *pack_name*, or cycle to next. Legacy --pack."""
     if not pack_name:
-        # Cycle to next
-        config = load_config_safe()
-        active = config.get("active_pack", "peon")
-        names = _list_pack_names()
-        if not names:
-            print("Error: no packs found", file=sys.stderr)
-            sys.exit(1)
-        try:
-            idx = names.index(active)
-            next_pack = names[(idx + 1) % len(names)]
-        except ValueError:
-            next_pack = names[0]
-        config["active_pack"] = next_pack
-        save_config(config)
-        manifest = _load_manifest(next_pack)
-        display = manifest.get("display_name", next_pack) if manifest else next_pack
-        print(f"peon-ping: switched to {next_pack} ({display})")
+        handle_packs_cmd(["next"])
     else:
-        names = _list_pack_names()
-        if pack_name not in names:
-            print(f'Error: pack "{pack_name}" not found.', file=sys.stderr)
-            print(f'Available packs: {", ".join(names)}', file=sys.stderr)
-            sys.exit(1)
-        config = load_config_safe()
-        config["active_pack"] = pack_name
-        save_config(config)
-        manifest = _load_manifest(pack_name)
-        display = manifest.get("display_name", pack_name) if manifest else pack_name
-        print(f"peon-ping: switched to {pack_name} ({display})")
-    sys.exit(0)
+        handle_packs_cmd(["use", pack_name])
 
 
 def handle_help() -> None:
@@ -1832,6 +2116,32 @@ def handle_help() -> None:
 # Main entry point
 # ---------------------------------------------------------------------------
 
+# Subcommand -> handler; every handler receives the arguments after the
+# command name, so zero-argument handlers are wrapped to drop them.
+_COMMANDS: Dict[str, Callable[[List[str]], None]] = {
+    # --- Positional subcommands (matching peon.sh) ---
+    "pause": lambda args: handle_pause(),
+    "resume": lambda args: handle_resume(),
+    "toggle": lambda args: handle_toggle(),
+    "status": lambda args: handle_status(),
+    "notifications": handle_notifications,
+    "packs": handle_packs_cmd,
+    "mobile": handle_mobile,
+    "relay": handle_relay,
+    "preview": handle_preview,
+    "help": lambda args: handle_help(),
+    "--help": lambda args: handle_help(),
+    "-h": lambda args: handle_help(),
+    # --- Legacy --flag aliases for backward compatibility ---
+    "--pause": lambda args: handle_pause(),
+    "--resume": lambda args: handle_resume(),
+    "--toggle": lambda args: handle_toggle(),
+    "--status": lambda args: handle_status(),
+    "--packs": lambda args: handle_packs_legacy(),
+    "--pack": lambda args: handle_pack_legacy(args[0] if args else None),
+}
+
+
 def main() -> None:
     # Manual argument parsing to exactly match the bash ``case`` behaviour.
     args = sys.argv[1:]
@@ -1850,43 +2160,9 @@ def main() -> None:
 
     cmd = args[0]
 
-    # --- Positional subcommands (matching peon.sh) ---
-    if cmd == "pause":
-        handle_pause()
-    elif cmd == "resume":
-        handle_resume()
-    elif cmd == "toggle":
-        handle_toggle()
-    elif cmd == "status":
-        handle_status()
-    elif cmd == "notifications":
-        handle_notifications(args[1:])
-    elif cmd == "packs":
-        handle_packs_cmd(args[1:])
-    elif cmd == "mobile":
-        handle_mobile(args[1:])
-    elif cmd == "relay":
-        handle_relay(args[1:])
-    elif cmd == "preview":
-        handle_preview(args[1:])
-    elif cmd in ("help", "--help", "-h"):
-        handle_help()
-
-    # --- Legacy --flag aliases for backward compatibility ---
-    elif cmd == "--pause":
-        handle_pause()
-    elif cmd == "--resume":
-        handle_resume()
-    elif cmd == "--toggle":
-        handle_toggle()
-    elif cmd == "--status":
-        handle_status()
-    elif cmd == "--packs":
-        handle_packs_legacy()
-    elif cmd == "--pack":
-        pack_arg = args[1] if len(args) > 1 else None
-        handle_pack_legacy(pack_arg)
-
+    handler = _COMMANDS.get(cmd)
+    if handler is not None:
+        handler(args[1:])
     elif cmd.startswith("--"):
         print(f"Unknown option: {cmd}", file=sys.stderr)
         print("Run 'peon help' for usage.", file=sys.stderr)
@@ -1899,3 +2175,12 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
+    # Flush and skip interpreter teardown (module and GC cleanup), which
+    # is a noticeable share of a hook's wall time.  Daemon threads have
+    # already had their chance to spawn and end with the process anyway.
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except Exception:
+        pass
+    os._exit(0)
@@ -0,0 +1,76 @@
+#!/usr/bin/env bats
+
+# Tests for install.py helpers (no network: downloads are stubbed in Python)
+
+setup() {
+  REPO_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/.." && pwd)"
+  TEST_DIR="$(mktemp -d)"
+}
+
+teardown() {
+  rm -rf "$TEST_DIR"
+}
+
+@test "download_many stops queued downloads on KeyboardInterrupt" {
+  run python3 - "$REPO_DIR" <<'PY'
+import sys, threading, time, _thread
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+import install
+
+ran = []
+def fake_download(url, dest):
+    ran.append(url)
+    time.sleep(0.2)
+install.download = fake_download
+
+tasks = [(f"http://example.invalid/{i}", Path(f"/tmp/{i}")) for i in range(100)]
+threading.Timer(0.5, _thread.interrupt_main).start()
+start = time.monotonic()
+try:
+    install.download_many(tasks, 4)
+except KeyboardInterrupt:
+    elapsed = time.monotonic() - start
+    print(f"interrupted after {elapsed:.2f}s, {len(ran)} downloads started")
+    sys.exit(0 if elapsed < 1.5 and len(ran) < 100 else 1)
+print("no KeyboardInterrupt")
+sys.exit(1)
+PY
+  [ "$status" -eq 0 ]
+  [[ "$output" == *"interrupted after"* ]]
+}
+
+@test "manifest_sound_files skips entries without a file" {
+  cat > "$TEST_DIR/openpeon.json" <<'JSON'
+{
+  "categories": {
+    "session.start": {
+      "sounds": [
+        { "file": "sounds/Hello1.wav" },
+        { "label": "no file here" },
+        { "file": "sounds/Hello2.wav" }
+      ]
+    },
+    "task.complete": {
+      "sounds": [
+        { "file": "sounds/Done1.wav" }
+      ]
+    }
+  }
+}
+JSON
+  run python3 - "$REPO_DIR" "$TEST_DIR/openpeon.json" <<'PY'
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+import install
+
+expected = ["sounds/Hello1.wav", "sounds/Hello2.wav", "sounds/Done1.wav"]
+results = [install.manifest_sound_files(Path(sys.argv[2]))]
+install.ijson = None  # also exercise the json fallback
+results.append(install.manifest_sound_files(Path(sys.argv[2])))
+print(results)
+sys.exit(0 if all(r == expected for r in results) else 1)
+PY
+  [ "$status" -eq 0 ]
+}
@@ -12,6 +12,85 @@ import shutil
 import sys
 from pathlib import Path
 
+try:
+    import orjson  # Optional: faster settings.json round-trip
+except ImportError:
+    orjson = None
+
+
+def _read_settings(path: Path) -> dict:
+    """Parse Claude Code's *settings.json*."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _write_settings(path: Path, settings: dict) -> None:
+    """Write *settings* to *path* as 2-space-indented JSON.
+
+    Nothing is written when the file already has exactly this content;
+    otherwise it is serialised up front and replaced atomically, so an
+    interrupted uninstall never leaves a truncated settings.json.
+    """
+    if orjson is not None:
+        blob = orjson.dumps(settings, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        blob = (json.dumps(settings, indent=2) + "\n").encode("utf-8")
+    # Write through a symlinked settings.json (e.g. dotfile managers)
+    target = Path(os.path.realpath(path))
+    try:
+        if target.read_bytes() == blob:
+            return
+    except OSError:
+        pass
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(blob)
+    try:
+        shutil.copymode(target, tmp)
+    except OSError:
+        pass
+    os.replace(tmp, target)
+
+
+def _is_peon_entry(entry: dict) -> bool:
+    """Return True if a settings.json hook entry runs peon.sh or peon.py."""
+    for hk in entry.get("hooks", []):
+        command = hk.get("command", "")
+        if "peon.sh" in command or "peon.py" in command:
+            return True
+    return False
+
+
+def _hook_commands(entries: list) -> set:
+    """Return the distinct hook command strings under *entries*."""
+    return {hk.get("command", "") for h in entries for hk in h.get("hooks", [])}
+
+
+def _remove_contents(path: str, errors: list) -> None:
+    """Delete everything under *path* bottom-up, recording paths that fail.
+
+    Entry types come from ``os.scandir`` (no extra stat per entry), and
+    symlinks -- including symlinked directories -- are unlinked, never
+    followed.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        errors.append(path)
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            _remove_contents(entry.path, errors)
+            remove = os.rmdir
+        else:
+            remove = os.unlink
+        try:
+            remove(entry.path)
+        except OSError:
+            errors.append(entry.path)
+
 
 def main() -> None:
     # Determine install directory (same logic as uninstall.sh)
@@ -23,51 +102,49 @@ def main() -> None:
 
     is_local = str(base_dir) != str(Path.home() / ".claude")
 
-    notify_backup = base_dir / "hooks" / "notify.sh.backup"
-    notify_sh = base_dir / "hooks" / "notify.sh"
+    hooks_root = base_dir / "hooks"
+    skills_root = base_dir / "skills"
+
+    notify_backup = hooks_root / "notify.sh.backup"
+    notify_sh = hooks_root / "notify.sh"
 
-    print("=== peon-ping uninstaller ===")
-    print()
+    print("=== peon-ping uninstaller ===\n")
+
+    # Parsed settings.json, shared by the hook-removal and notify.sh restore
+    # steps so the file is only read once.  Set as soon as the first step
+    # reads it; reset to None if that step fails, so the restore re-reads.
+    settings = None
 
     # --- Remove hook entries from settings.json ---
     if settings_path.exists():
         print("Removing peon hooks from settings.json...")
         try:
-            with open(settings_path, "r", encoding="utf-8") as fh:
-                settings = json.load(fh)
+            settings = _read_settings(settings_path)
 
             hooks = settings.get("hooks", {})
             events_cleaned = []
+            emptied = []
 
-            for event in list(hooks.keys()):
-                entries = hooks[event]
-                original_count = len(entries)
-                entries = [
-                    h for h in entries
-                    if not any(
-                        "peon.sh" in hk.get("command", "")
-                        or "peon.py" in hk.get("command", "")
-                        for hk in h.get("hooks", [])
-                    )
-                ]
-                if len(entries) < original_count:
+            for event, entries in hooks.items():
+                kept = [h for h in entries if not _is_peon_entry(h)]
+                if len(kept) < len(entries):
                     events_cleaned.append(event)
-                if entries:
-                    hooks[event] = entries
+                if kept:
+                    hooks[event] = kept
                 else:
-                    del hooks[event]
-
-            settings["hooks"] = hooks
-
-            with open(settings_path, "w", encoding="utf-8") as fh:
-                json.dump(settings, fh, indent=2)
-                fh.write("\n")
+                    emptied.append(event)
+            # Deleted after the loop; a dict can't shrink while iterated
+            for event in emptied:
+                del hooks[event]
 
             if events_cleaned:
+                settings["hooks"] = hooks
+                _write_settings(settings_path, settings)
                 print(f"Removed hooks for: {', '.join(events_cleaned)}")
             else:
                 print("No peon hooks found in settings.json")
         except Exception as exc:
+            settings = None
             print(f"Warning: Could not update settings.json: {exc}")
 
     # --- Restore notify.sh backup (global install only) ---
@@ -82,8 +159,8 @@ def main() -> None:
 
         if response.lower() != "n":
             try:
-                with open(settings_path, "r", encoding="utf-8") as fh:
-                    settings = json.load(fh)
+                if settings is None:
+                    settings = _read_settings(settings_path)
 
                 hooks = settings.setdefault("hooks", {})
                 notify_hook_entry = {
@@ -97,20 +174,13 @@ def main() -> None:
 
                 for event in ("SessionStart", "UserPromptSubmit", "Stop", "Notification"):
                     event_hooks = hooks.get(event, [])
-                    has_notify = any(
-                        "notify.sh" in hk.get("command", "")
-                        for h in event_hooks
-                        for hk in h.get("hooks", [])
-                    )
-                    if not has_notify:
+                    if not any("notify.sh" in c for c in _hook_commands(event_hooks)):
                         event_hooks.append(notify_hook_entry)
                     hooks[event] = event_hooks
 
                 settings["hooks"] = hooks
 
-                with open(settings_path, "w", encoding="utf-8") as fh:
-                    json.dump(settings, fh, indent=2)
-                    fh.write("\n")
+                _write_settings(settings_path, settings)
 
                 print(
                     "Restored notify.sh hooks for: "
@@ -125,16 +195,17 @@ def main() -> None:
 
     # --- Remove fish completions ---
     fish_completions = Path.home() / ".config" / "fish" / "completions" / "peon.fish"
-    if fish_completions.exists():
+    try:
         fish_completions.unlink()
         print("Removed fish completions")
+    except FileNotFoundError:
+        pass
 
     # --- Remove skill directories ---
     for skill_name in ("peon-ping-toggle", "peon-ping-config"):
-        skill_dir = base_dir / "skills" / skill_name
+        skill_dir = skills_root / skill_name
         if skill_dir.exists():
-            print()
-            print(f"Removing {skill_dir}...")
+            print(f"\nRemoving {skill_dir}...")
             shutil.rmtree(skill_dir)
             print(f"Removed {skill_name} skill")
 
@@ -143,20 +214,12 @@ def main() -> None:
     # inside ~/.claude/hooks/peon-ping.  When running from the source repo
     # (is_local), the directory is the project itself and must not be deleted.
     if not is_local and install_dir.exists():
-        print()
-        print(f"Removing {install_dir}...")
+        print(f"\nRemoving {install_dir}...")
         # We are running from inside install_dir, so on Windows we may not be
         # able to remove the directory while the script is running.  Delete
         # everything we can and schedule the rest for cleanup.
         errors: list[str] = []
-        for item in sorted(install_dir.rglob("*"), reverse=True):
-            try:
-                if item.is_file() or item.is_symlink():
-                    item.unlink()
-                elif item.is_dir():
-                    item.rmdir()
-            except Exception:
-                errors.append(str(item))
+        _remove_contents(str(install_dir), errors)
         # Try removing the directory itself
         try:
             install_dir.rmdir()
@@ -171,9 +234,7 @@ def main() -> None:
             else:
                 print(f"Please delete manually: {install_dir}")
 
-    print()
-    print("=== Uninstall complete ===")
-    print("Me go now.")
+    print("\n=== Uninstall complete ===\nMe go now.")
 
 
 if __name__ == "__main__":